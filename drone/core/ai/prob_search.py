@@ -10,11 +10,48 @@ Implements the core logic from the patent:
 This file was originally at `coordinator/prob_search.py`
 and is now run locally by the Scout drone.
 """
+import logging
 import numpy as np
 import math
 from core.position import Position
 from core.config_models import SearchAreaConfig, ProbSearchConfig
 
+logger = logging.getLogger(__name__)
+
+# --- NEW: Grid kernels (module-level, operate on raw arrays only) ---
+
+def _evolve_kernel(grid: np.ndarray, out: np.ndarray, dy: int, dx: int) -> None:
+    """Same result as np.roll(grid, (dy, dx), axis=(0, 1)), written into a preallocated `out`."""
+    h, w = grid.shape
+    dy %= h
+    dx %= w
+    out[dy:, dx:] = grid[:h - dy, :w - dx]
+    out[dy:, :dx] = grid[:h - dy, w - dx:]
+    out[:dy, dx:] = grid[h - dy:, :w - dx]
+    out[:dy, :dx] = grid[h - dy:, w - dx:]
+
+def _update_kernel(grid: np.ndarray, coords: np.ndarray, px: float, py: float,
+                   radius: float, miss_prob: float) -> float:
+    """
+    Multiplies cells whose centre lies within `radius` of (px, py) by `miss_prob`,
+    then normalizes the grid in place. Only the bounding window of the sensor
+    footprint is touched before normalization. Returns the pre-normalization sum.
+    """
+    # coords is sorted, so the footprint's bounding window is two binary searches per axis
+    c0 = np.searchsorted(coords, px - radius, side='left')
+    c1 = np.searchsorted(coords, px + radius, side='right')
+    r0 = np.searchsorted(coords, py - radius, side='left')
+    r1 = np.searchsorted(coords, py + radius, side='right')
+    if c0 < c1 and r0 < r1:
+        dist_sq = (coords[r0:r1, None] - py)**2 + (coords[c0:c1] - px)**2
+        window = grid[r0:r1, c0:c1]
+        window[dist_sq < radius * radius] *= miss_prob
+
+    total = grid.sum()
+    if total > 0:
+        grid /= total
+    return total
+
 class ProbabilisticSearchManager:
     """Manages the probability grid for the MOB search."""
     
@@ -26,28 +63,33 @@ class ProbabilisticSearchManager:
         self.grid_size = config.grid_size
         self.cell_size = config.search_area_size_m / config.grid_size
         
-        # The core probability field p(x,y)
-        self.probability_grid = np.ones((self.grid_size, self.grid_size))
+        # The core probability field p(x,y). FP32 is ample for values in [0, 1].
+        self.probability_grid = np.ones((self.grid_size, self.grid_size), dtype=np.float32)
         self.total_search_area_m = config.search_area_size_m
+        self._half_area = self.total_search_area_m / 2.0
+        
+        # Cells below this are treated as already searched (see is_cell_negligible)
+        self.skip_threshold = config.gossip_skip_ratio / (self.grid_size * self.grid_size)
+        
+        # Scratch buffer for evolve_map (swapped with the grid each shift)
+        self._scratch = np.empty_like(self.probability_grid)
         
-        # Pre-calculate cell center positions (in meters)
-        self.cell_centers_x, self.cell_centers_y = self._create_cell_centers()
+        # Pre-calculate cell center positions (in meters). The grid is square,
+        # so one axis vector serves both rows (y) and columns (x).
+        self.cell_coords = self._create_cell_centers()
         
         self.initialize_map()
         print(f"[ProbSearch] Initialized {self.grid_size}x{self.grid_size} grid.")
         print(f"[ProbSearch] Cell size: {self.cell_size:.1f}m. Total area: {self.total_search_area_m}m.")
 
-    def _create_cell_centers(self):
-        """Creates matrices of the world coordinates for each cell center."""
+    def _create_cell_centers(self) -> np.ndarray:
+        """Creates the (sorted) vector of cell center coordinates along one axis."""
         half_area = self.total_search_area_m / 2.0
-        # Vector of cell center coordinates
-        coords = np.linspace(
+        return np.linspace(
             -half_area + self.cell_size / 2.0,
             half_area - self.cell_size / 2.0,
             self.grid_size
         )
-        # Create 2D grids of coordinates
-        return np.meshgrid(coords, coords)
 
     def initialize_map(self):
         """Initialize the map with a uniform (or Gaussian) prior."""
@@ -68,8 +110,8 @@ class ProbabilisticSearchManager:
         
         # Get the world coordinates for this cell
         # (Relative to the search area center)
-        x = self.cell_centers_x[row, col] + self.area.x
-        y = self.cell_centers_y[row, col] + self.area.y
+        x = self.cell_coords[col] + self.area.x
+        y = self.cell_coords[row] + self.area.y
         
         # Use a high altitude to maximize search radius
         z = self.config.search_altitude
@@ -79,16 +121,49 @@ class ProbabilisticSearchManager:
         
         return Position(x=x, y=y, z=z)
 
+    def plan_next_waypoint(self, dt: float) -> Position:
+        """
+        evolve_map(dt) followed by get_next_search_waypoint(), as one call for a
+        worker thread (numpy releases the GIL for the heavy parts). Not locked:
+        the search loop is the grid's only user while it awaits the plan, since
+        gossip is handled by the same listener task that runs the mission chain.
+        """
+        self.evolve_map(dt)
+        return self.get_next_search_waypoint()
+
+    def world_to_cell(self, x: float, y: float) -> tuple[int, int]:
+        """
+        Converts a world (x, y) to (row, col) grid indices.
+        Not clamped: positions outside the search area map to out-of-range cells.
+        """
+        col = math.floor((x - self.area.x + self._half_area) / self.cell_size)
+        row = math.floor((y - self.area.y + self._half_area) / self.cell_size)
+        return row, col
+
+    def is_cell_negligible(self, row: int, col: int) -> bool:
+        """True if (row, col) is inside the grid and its probability is below skip_threshold."""
+        if 0 <= row < self.grid_size and 0 <= col < self.grid_size:
+            return self.probability_grid[row, col] < self.skip_threshold
+        return False
+
     def update_map(self, drone_pos: Position, drone_altitude: float, has_detection: bool):
         """
         Bayesian update of the probability map based on a sensor observation.
         This is the core of the patent's logic.
         """
+        row, col = self.world_to_cell(drone_pos.x, drone_pos.y)
+        self.update_map_at(row, col, drone_altitude, has_detection)
+
+    def update_map_at(self, row: int, col: int, drone_altitude: float, has_detection: bool):
+        """
+        Same as update_map(), for an observation already converted to grid
+        indices (see world_to_cell). The sensor footprint is centred on the cell.
+        """
         if has_detection:
             # If a detection was made, we re-center the probability
             # In a real system, this is a complex update.
             # For now, we'll just log it.
-            print(f"[ProbSearch] Detection reported at {drone_pos}. Map should be re-centered.")
+            logger.info("[ProbSearch] Detection reported at cell (%d, %d). Map should be re-centered.", row, col)
             # self.probability_grid.fill(0.0)
             # ... (logic to create a new probability peak)
             return
@@ -99,30 +174,17 @@ class ProbabilisticSearchManager:
         sensor_radius = self.config.r_max * (drone_altitude / 
                          (drone_altitude + self.config.h_ref))
         
-        # 2. Find all cells within the sensor radius
-        # Calculate distance from drone to *all* cell centers at once
-        dist_sq = (self.cell_centers_x - drone_pos.x)**2 + \
-                  (self.cell_centers_y - drone_pos.y)**2
-        
-        sensor_radius_sq = sensor_radius**2
-        
-        # Create a boolean mask of cells inside the radius
-        cells_in_radius = dist_sq < sensor_radius_sq
-        
-        # 3. Apply Bayesian Update
+        # 2-4. Bayesian update of the cells inside the sensor radius, then normalize
         # P(Target | No-Detect) = P(No-Detect | Target) * P(Target) / P(No-Detect)
         # P(No-Detect | Target) is the miss probability (e.g., 0.1)
-        miss_prob = self.config.miss_probability
-        
-        # Update cells *inside* sensor radius
-        self.probability_grid[cells_in_radius] *= miss_prob
-        
-        # 4. Normalize the entire grid so it sums to 1
-        total_prob = np.sum(self.probability_grid)
-        if total_prob > 0:
-            self.probability_grid /= total_prob
-        else:
-            print("[ProbSearch] Warning: Probability grid collapsed. Re-initializing.")
+        total_prob = _update_kernel(
+            self.probability_grid, self.cell_coords,
+            (col + 0.5) * self.cell_size - self._half_area,
+            (row + 0.5) * self.cell_size - self._half_area,
+            sensor_radius, self.config.miss_probability
+        )
+        if total_prob <= 0:
+            logger.warning("[ProbSearch] Warning: Probability grid collapsed. Re-initializing.")
             self.initialize_map()
 
     def evolve_map(self, dt: float):
@@ -135,21 +197,19 @@ class ProbabilisticSearchManager:
         dy = int(self.config.drift_y_m_s * dt / self.cell_size)
         
         if dx != 0 or dy != 0:
-            # Roll the numpy array, simulating the grid moving
-            self.probability_grid = np.roll(self.probability_grid, shift=(dy, dx), axis=(0, 1))
+            # Roll the grid into the scratch buffer and swap (no per-call allocation)
+            _evolve_kernel(self.probability_grid, self._scratch, dy, dx)
+            self.probability_grid, self._scratch = self._scratch, self.probability_grid
 
     def confirm_target_at(self, pos: Position):
         """A target has been confirmed. Create a new probability peak here."""
         print(f"[ProbSearch] Target confirmed at {pos}. Locking map.")
-        self.probability_grid.fill(0.0)
-        
         # Find the cell index for this position
-        half_area = self.total_search_area_m / 2.0
-        col = int((pos.x - self.area.x + half_area) / self.cell_size)
-        row = int((pos.y - self.area.y + half_area) / self.cell_size)
+        row, col = self.world_to_cell(pos.x, pos.y)
         
         # Clamp to grid size
         col = np.clip(col, 0, self.grid_size - 1)
         row = np.clip(row, 0, self.grid_size - 1)
 
+        self.probability_grid.fill(0.0)
         self.probability_grid[row, col] = 1.0
\ No newline at end of file
@@ -9,10 +9,13 @@ from .drone import Drone, Telemetry
 from .cameras.dual_camera import DualCameraSystem
 from .detection.fusion_detector import FusionDetector
 # --- FIX: Import specific configs ---
-from .config_models import Settings, PrecisionHoverConfig, CameraIntrinsicsConfig
-from typing import List, Tuple
-from .cameras.base import Detection
-from .navigation import CameraIntrinsics, image_to_world_position
+from .config_models import Settings, PrecisionHoverConfig
+from typing import Tuple
+from .cameras.base import Detection, best_detection as best_of
+from .navigation import CameraIntrinsicsHelper, image_to_world_position
+
+_EMPTY: Tuple[Detection, ...] = () # Shared "no detections" sentinel
+SCAN_LOG_INTERVAL_S = 1.0 # Max rate of the per-step "Scanning at" log line
 
 class SearchBehavior:
     """Encapsulates search behavior with dual camera and fusion tracker."""
@@ -38,10 +41,24 @@ class SearchBehavior:
         self.detector = FusionDetector(config.detection)
         
         # --- FIX: Correctly access intrinsics from *visual* camera ---
-        self.intrinsics = CameraIntrinsics(config.cameras.visual.intrinsics)
+        # Built once: K_inv here, per-attitude ray maps cached in navigation
+        self.intrinsics = CameraIntrinsicsHelper(config.cameras.visual.intrinsics)
         # -------------------------------------------------------------
         
-        self.last_detections: List[Detection] = []
+        # Immutable snapshot of the latest confirmed detections, replaced once per
+        # search step so readers (telemetry loop) never need a copy.
+        self._last_detections: Tuple[Detection, ...] = _EMPTY
+
+        # Per-step thresholds, resolved once instead of walking the config
+        # tree on every frame
+        self._fusion_threshold = config.detection.fusion.fusion_threshold
+        self._max_iterations = config.mission.max_search_iterations
+        self._last_log_ts = 0.0
+
+        # Running mission stats, bumped as detections arrive so the end-of-mission
+        # summary doesn't need to rescan anything
+        self.detection_count = 0
+        self.person_count = 0
     
     async def search_step(self) -> Tuple[bool, Detection | None]:
         """
@@ -54,7 +71,11 @@ class SearchBehavior:
         # The drone no longer moves itself during 'SEARCHING'
         # It just scans at its current location.
         # The Coordinator's AI tells it where to go via GOTO_WAYPOINT commands.
-        self.logger.log(f"Scanning at {self.drone.telemetry.position}...", "debug")
+        # --- CHANGED: Rate-limited; each log() call is a file open/write + print
+        now = time.monotonic()
+        if now - self._last_log_ts >= SCAN_LOG_INTERVAL_S:
+            self.logger.log(f"Scanning at {self.drone.telemetry.position}...", "debug")
+            self._last_log_ts = now
         
         # 1. Capture synchronized frame
         dual_frame = await self.dual_camera.capture_synchronized()
@@ -64,14 +85,19 @@ class SearchBehavior:
         
         # 3. Detect
         confirmed_detections = await self.detector.detect(dual_frame)
-        self.last_detections = confirmed_detections
+        if confirmed_detections:
+            self._last_detections = tuple(confirmed_detections)
+            self.detection_count += len(confirmed_detections)
+            self.person_count += sum(d.is_person for d in confirmed_detections)
+        else:
+            self._last_detections = _EMPTY
         
         self.iteration += 1
         
         # 4. Report *raw* detections to Coordinator's AI
         # This feeds the probabilistic map
         if confirmed_detections:
-            best_detection = max(confirmed_detections, key=lambda d: d.confidence)
+            best_detection = best_of(confirmed_detections)
             
             best_detection.position_world = self._image_to_world_position(
                 best_detection.position_image,
@@ -90,20 +116,19 @@ class SearchBehavior:
             # --- FIX: Check if this detection is a *confirmed* target ---
             # This logic is now simplified: if the tracker has high confidence,
             # we ask the operator to confirm.
-            if best_detection.confidence > self.config.detection.fusion.fusion_threshold:
+            if best_detection.confidence > self._fusion_threshold:
                  # Return the detection to trigger 'target_sighted'
                  return True, best_detection
 
         # 5. Check for max iterations
-        max_iter = self.config.mission.max_search_iterations
-        if self.iteration >= max_iter:
+        if self.iteration >= self._max_iterations:
             return False, None # Search complete (timeout)
         
         return True, None  # Keep searching
         # -------------------------------------------
     
-    def get_last_detections(self) -> List[Detection]:
-        return self.last_detections
+    def get_last_detections(self) -> Tuple[Detection, ...]:
+        return self._last_detections
 
     def _image_to_world_position(self, 
                                  image_pos: tuple, 
@@ -3,18 +3,18 @@ Abstract camera interfaces for dual-camera system
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence
 import numpy as np
 import time
 
-@dataclass
+@dataclass(slots=True)
 class CameraFrame:
     """Base class for camera frame data"""
     timestamp: float
     frame_number: int
     metadata: dict
 
-@dataclass
+@dataclass(slots=True)
 class ThermalFrame(CameraFrame):
     """Thermal camera frame data"""
     temperature_array: np.ndarray  # 2D array of temperatures (Celsius)
@@ -22,13 +22,14 @@ class ThermalFrame(CameraFrame):
     max_temp: float
     resolution: tuple  # (width, height)
 
-@dataclass
+@dataclass(slots=True)
 class VisualFrame(CameraFrame):
     """Visual/RGB camera frame data"""
-    image: np.ndarray  # RGB image array (H, W, 3)
+    image: np.ndarray  # Color image array (H, W, 3), channel order per pixel_order
     resolution: tuple  # (width, height)
+    pixel_order: str = 'rgb'  # 'rgb' or 'bgr' (OpenCV-native; recorded without conversion)
 
-@dataclass
+@dataclass(slots=True)
 class Detection:
     """Unified detection from either camera"""
     position_image: tuple  # (x, y) in image coordinates
@@ -38,6 +39,14 @@ class Detection:
     source: str  # 'thermal', 'visual', or 'fusion'
     metadata: dict
 
+def best_detection(detections: Sequence[Detection]) -> Optional[Detection]:
+    """Highest-confidence detection, or None if there are none"""
+    if not detections:
+        return None
+    # One C-level max() over the confidences instead of a key lambda per element
+    confs = [d.confidence for d in detections]
+    return detections[confs.index(max(confs))]
+
 class BaseCamera(ABC):
     """Abstract base class for all cameras"""
     
@@ -2,13 +2,18 @@
 Asynchronous synchronized dual camera system (Thermal + Visual)
 """
 import asyncio
+import logging
 import time
 from dataclasses import dataclass
 from typing import Optional, Tuple
 from .base import ThermalFrame, VisualFrame, BaseCamera
-# Assuming VideoRecorder is also refactored to have async methods
+# VideoRecorder is synchronous: write_frame() only enqueues for its writer thread
 from core.recording.video_recorder import VideoRecorder 
 
+logger = logging.getLogger(__name__)
+
+SYNC_WARN_INTERVAL_S = 1.0 # At most one sync warning per interval; the rest are counted
+
 # NEW: Custom exceptions for clarity
 class CameraConnectionError(Exception):
     pass
@@ -16,7 +21,7 @@ class CameraConnectionError(Exception):
 class CameraCaptureError(Exception):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class DualFrame:
     """Synchronized frame from both cameras"""
     thermal: ThermalFrame
@@ -27,18 +32,25 @@ class DualFrame:
 class DualCameraSystem:
     """Manages thermal + visual camera system asynchronously."""
     
-    def __init__(self, thermal_camera: BaseCamera, visual_camera: BaseCamera, recording_enabled: bool = True):
+    def __init__(self, thermal_camera: BaseCamera, visual_camera: BaseCamera, recording_enabled: bool = True,
+                 thermal_range: Optional[Tuple[float, float]] = None):
         """
         Initialize dual camera system
         
         Args:
-            thermal_camera: An awaitable BaseCamera instance
-            visual_camera: An awaitable BaseCamera instance
+            thermal_camera: A (synchronous) BaseCamera instance
+            visual_camera: A (synchronous) BaseCamera instance
             recording_enabled: Enable video recording
+            thermal_range: Fixed (min, max) Celsius for the recorded thermal colormap
         """
         self.thermal = thermal_camera
         self.visual = visual_camera
+        # --- NEW: Bind the concrete capture methods once (skips the attribute
+        # lookups per frame, as Drone does for its controller)
+        self._capture_thermal = thermal_camera.capture
+        self._capture_visual = visual_camera.capture
         self.recording_enabled = recording_enabled
+        self.thermal_range = thermal_range
         self.recorder: Optional[VideoRecorder] = None
         
         self.connected = False
@@ -46,6 +58,8 @@ class DualCameraSystem:
         
         # Sync parameters
         self.max_sync_delta = 0.1  # Max 100ms between frames
+        self._sync_warn_ts = 0.0
+        self._sync_warn_suppressed = 0
     
     # CHANGED: Now async
     async def connect(self) -> bool:
@@ -54,9 +68,10 @@ class DualCameraSystem:
         
         try:
             # CHANGED: Run connections in parallel
+            # --- FIX: BaseCamera methods are synchronous; run them in worker threads
             results = await asyncio.gather(
-                self.thermal.connect(),
-                self.visual.connect()
+                asyncio.to_thread(self.thermal.connect),
+                asyncio.to_thread(self.visual.connect)
             )
             thermal_ok, visual_ok = results
             
@@ -67,9 +82,10 @@ class DualCameraSystem:
             if self.recording_enabled:
                 self.recorder = VideoRecorder(
                     visual_resolution=self.visual.get_resolution(),
-                    thermal_resolution=self.thermal.get_resolution()
+                    thermal_resolution=self.thermal.get_resolution(),
+                    thermal_range=self.thermal_range
                 )
-                await self.recorder.start()  # Assumes recorder.start() is async
+                self.recorder.start() # --- FIX: start() is synchronous (just sets a flag)
             
             self.connected = True
             print("[DualCamera] Both cameras connected")
@@ -90,9 +106,10 @@ class DualCameraSystem:
             sync_start = time.time()
             
             # CHANGED: Capture from both cameras in parallel
+            # --- FIX: capture() is synchronous (BaseCamera); each runs in a worker thread
             thermal_frame, visual_frame = await asyncio.gather(
-                self.thermal.capture(),  # Assumes camera.capture() is async
-                self.visual.capture()
+                asyncio.to_thread(self._capture_thermal),
+                asyncio.to_thread(self._capture_visual)
             )
             
             sync_timestamp = time.time()
@@ -102,14 +119,21 @@ class DualCameraSystem:
             
             # Record if enabled
             if self.recorder:
-                # Run recording in the background, don't block the capture loop
-                asyncio.create_task(
-                    self.recorder.write_frame(thermal_frame, visual_frame)
-                )
+                # --- FIX: No Task per frame (write_frame() isn't a coroutine). It hands
+                # the pair to the recorder's bounded queue and single writer thread,
+                # which keeps frames in order and drops the oldest if encoding lags.
+                self.recorder.write_frame(thermal_frame, visual_frame)
             
-            # Warn if sync is poor
+            # Warn if sync is poor (rate-limited: a drifting camera is out of sync every frame)
             if time_delta > self.max_sync_delta * 1000:
-                print(f"[DualCamera] Warning: Sync delta {time_delta:.1f}ms > {self.max_sync_delta*1000}ms")
+                now = time.monotonic()
+                if now - self._sync_warn_ts >= SYNC_WARN_INTERVAL_S:
+                    logger.warning("[DualCamera] Warning: Sync delta %.1fms > %.1fms (%d more since last report)",
+                                   time_delta, self.max_sync_delta * 1000, self._sync_warn_suppressed)
+                    self._sync_warn_ts = now
+                    self._sync_warn_suppressed = 0
+                else:
+                    self._sync_warn_suppressed += 1
             
             return DualFrame(
                 thermal=thermal_frame,
@@ -125,11 +149,13 @@ class DualCameraSystem:
     async def disconnect(self):
         """Disconnect both cameras and stop recording."""
         if self.recorder:
-            await self.recorder.stop()  # Assumes recorder.stop() is async
+            # --- FIX: stop() is synchronous and joins the writer thread while it
+            # drains the queue; wait for that off the event loop
+            await asyncio.to_thread(self.recorder.stop)
         
         await asyncio.gather(
-            self.thermal.disconnect(),
-            self.visual.disconnect()
+            asyncio.to_thread(self.thermal.disconnect),
+            asyncio.to_thread(self.visual.disconnect)
         )
         
         self.connected = False
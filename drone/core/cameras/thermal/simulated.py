@@ -1,6 +1,7 @@
 """
 Simulated thermal camera for testing detection algorithms
 """
+import math
 import numpy as np
 import time
 import random
@@ -96,19 +97,21 @@ class SimulatedThermalCamera(BaseCamera):
         size_y = random.randint(12, 20)  # Height in pixels
         
         # Create Gaussian heat signature
+        # --- CHANGED: Squared distances throughout; the falloff only needs dist**2
+        max_dist_sq = (size_x/2)**2 + (size_y/2)**2
+        sigma2_x2 = 2 * (max_dist_sq / 4) # 2 * (max_dist/2)**2
         for dy in range(-size_y//2, size_y//2):
             for dx in range(-size_x//2, size_x//2):
                 px = x + dx
                 py = y + dy
                 
                 if 0 <= px < width and 0 <= py < height:
-                    # Distance from center
-                    dist = np.sqrt(dx**2 + dy**2)
-                    max_dist = np.sqrt((size_x/2)**2 + (size_y/2)**2)
+                    # Squared distance from center
+                    dist_sq = dx*dx + dy*dy
                     
                     # Gaussian falloff
-                    if dist < max_dist:
-                        intensity = np.exp(-(dist**2) / (2 * (max_dist/2)**2))
+                    if dist_sq < max_dist_sq:
+                        intensity = math.exp(-dist_sq / sigma2_x2)
                         temp_increase = (self.person_temp - self.water_temp) * intensity
                         frame[py, px] += temp_increase
     
@@ -129,8 +132,10 @@ class SimulatedThermalCamera(BaseCamera):
                 py = y + dy
                 
                 if 0 <= px < width and 0 <= py < height:
-                    dist = np.sqrt(dx**2 + dy**2)
-                    if dist < size:
+                    # Compare squared; only pixels inside the disc need the sqrt
+                    dist_sq = dx*dx + dy*dy
+                    if dist_sq < size*size:
+                        dist = math.sqrt(dist_sq)
                         frame[py, px] += temp_increase * (1 - dist/size)
     
     def get_resolution(self) -> tuple:
@@ -20,9 +20,13 @@ class SimulatedVisualCamera(BaseCamera):
         self.connected = False
         self.frame_count = 0
         
-        # Colors
-        self.water_color = np.array([30, 80, 140])  # Blue water
-        self.person_color = np.array([200, 150, 120])  # Skin tone
+        # --- CHANGED: Frames are generated in BGR (OpenCV's native order), so
+        # the recorder can write them without a per-frame color conversion ---
+        self.pixel_order = 'bgr'
+        
+        # Colors (BGR)
+        self.water_color = np.array([140, 80, 30])  # Blue water
+        self.person_color = np.array([120, 150, 200])  # Skin tone
         self.person_present = False
         self.person_position = None
     
@@ -33,7 +37,7 @@ class SimulatedVisualCamera(BaseCamera):
         return True
     
     def capture(self) -> VisualFrame:
-        """Generate synthetic RGB frame"""
+        """Generate synthetic color frame (BGR)"""
         if not self.connected:
             raise RuntimeError("Camera not connected")
         
@@ -62,6 +66,7 @@ class SimulatedVisualCamera(BaseCamera):
         return VisualFrame(
             image=frame,
             resolution=self.resolution,
+            pixel_order=self.pixel_order,
             timestamp=time.time(),
             frame_number=self.frame_count,
             metadata={
@@ -4,17 +4,30 @@ MQTT Communication Bus for the Drone-MOB fleet.
 Handles connection, asynchronous publishing, and asynchronous message subscription.
 """
 import asyncio
-import json
+import zlib
+import orjson # <-- CHANGED: C-accelerated JSON for the telemetry hot path
 import paho.mqtt.client as mqtt
 from .config_models import MqttConfig
 from typing import AsyncGenerator, Tuple
 
+# --- NEW: Optional payload compression ---
+# JSON never starts with 0x01, so the byte marks a zlib-compressed payload.
+ZLIB_MAGIC = b"\x01"
+COMPRESS_THRESHOLD = 1024 # Bytes; smaller payloads aren't worth compressing
+CONNECT_TIMEOUT_S = 5.0
+
 class MqttClient:
     """Async wrapper for the Paho MQTT client."""
     
-    def __init__(self, config: MqttConfig, client_id: str):
+    def __init__(self, config: MqttConfig, client_id: str, raw_payloads: bool = False):
+        """
+        Args:
+            raw_payloads: Queue payloads as the received bytes instead of parsed
+                JSON (for pass-through users such as the hub relay; see listen_raw).
+        """
         self.config = config
         self.client_id = client_id
+        self.raw_payloads = raw_payloads
         
         # Paho client setup
         self._client = mqtt.Client(
@@ -28,6 +41,9 @@ class MqttClient:
         # Async queue for decoupling Paho's thread from asyncio
         self.incoming_messages: asyncio.Queue = asyncio.Queue()
         self.is_connected = False
+        # --- NEW: Set (from Paho's thread) once the broker answers the CONNECT
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._connack_evt = asyncio.Event()
 
     def _on_connect(self, client, userdata, flags, reason_code, properties):
         """Paho callback for when connection is established."""
@@ -38,6 +54,8 @@ class MqttClient:
         else:
             print(f"[{self.client_id} MQTT] Failed to connect: {reason_code}")
             self.is_connected = False
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._connack_evt.set)
 
     def _on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         """Paho callback for when disconnected."""
@@ -46,12 +64,19 @@ class MqttClient:
 
     def _on_message(self, client, userdata, msg: mqtt.MQTTMessage):
         """Paho callback for all subscribed messages."""
+        if self.raw_payloads:
+            # Pass-through: no decompress/parse, forwarded byte-for-byte
+            self.incoming_messages.put_nowait((msg.topic, msg.payload))
+            return
         try:
             topic = msg.topic
-            payload = json.loads(msg.payload.decode('utf-8'))
+            raw = msg.payload
+            if raw[:1] == ZLIB_MAGIC:
+                raw = zlib.decompress(raw[1:])
+            payload = orjson.loads(raw) # Accepts bytes, no decode step
             # Put the parsed message into the async queue
             self.incoming_messages.put_nowait((topic, payload))
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             print(f"[{self.client_id} MQTT] Received non-JSON message on {msg.topic}")
         except Exception as e:
             print(f"[{self.client_id} MQTT] Error in on_message: {e}")
@@ -60,16 +85,19 @@ class MqttClient:
         """Asynchronously connect to the MQTT broker."""
         print(f"[{self.client_id} MQTT] Attempting connection to {self.config.host}...")
         try:
+            self._loop = asyncio.get_running_loop()
+            self._connack_evt.clear()
             self._client.connect(self.config.host, self.config.port, 60)
             self._client.loop_start() # Starts Paho's network thread
             
-            # Wait for the connection to be established
-            for _ in range(10):
-                if self.is_connected:
-                    return
-                await asyncio.sleep(0.5)
+            # --- CHANGED: Wake on the CONNACK itself instead of polling every 0.5 s
+            try:
+                await asyncio.wait_for(self._connack_evt.wait(), CONNECT_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                print(f"[{self.client_id} MQTT] Connection timed out.")
+            if self.is_connected:
+                return
             
-            print(f"[{self.client_id} MQTT] Connection timed out.")
             self._client.loop_stop()
 
         except Exception as e:
@@ -81,15 +109,27 @@ class MqttClient:
         self._client.loop_stop() # Stop the network thread
         self._client.disconnect()
 
-    async def publish(self, topic: str, payload: dict, retain: bool = False):
+    async def publish(self, topic: str, payload: dict, retain: bool = False, qos: int = 1):
         """Publish an asynchronous JSON message."""
+        # OPT_SERIALIZE_NUMPY: AI waypoints/detections may carry numpy scalars
+        message = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        await self.publish_raw(topic, message, retain=retain, qos=qos)
+
+    async def publish_raw(self, topic: str, message: bytes, retain: bool = False,
+                          qos: int = 1, compress: bool = False):
+        """
+        Publish an already-encoded JSON payload (skips serialization).
+        With compress=True, payloads over COMPRESS_THRESHOLD are zlib-compressed
+        (prefixed with ZLIB_MAGIC; _on_message undoes this transparently).
+        """
         if not self.is_connected:
             print(f"[{self.client_id} MQTT] Not connected. Cannot publish to {topic}")
             return
             
+        if compress and len(message) > COMPRESS_THRESHOLD:
+            message = ZLIB_MAGIC + zlib.compress(message, 1)
         full_topic = f"{self.config.base_topic}/{topic}"
-        message = json.dumps(payload)
-        self._client.publish(full_topic, message, qos=1, retain=retain)
+        self._client.publish(full_topic, message, qos=qos, retain=retain)
 
     async def subscribe(self, topic: str):
         """Subscribe to a topic."""
@@ -103,9 +143,29 @@ class MqttClient:
 
     async def listen(self) -> AsyncGenerator[Tuple[str, dict], None]:
         """Async generator to yield messages from the queue."""
+        prefix = f"{self.config.base_topic}/"
         while True:
             topic, payload = await self.incoming_messages.get()
             # Strip base topic to make it easier to handle
-            short_topic = topic.removeprefix(f"{self.config.base_topic}/")
-            yield short_topic, payload
+            yield topic.removeprefix(prefix), payload
+
+    # --- NEW: Raw pass-through receive ---
+    async def listen_raw(self) -> AsyncGenerator[Tuple[str, bytes], None]:
+        """
+        Like listen(), but yields each payload as the bytes received (possibly
+        zlib-framed, see ZLIB_MAGIC). Requires raw_payloads=True.
+        """
+        if not self.raw_payloads:
+            raise RuntimeError("listen_raw() requires MqttClient(raw_payloads=True)")
+        async for topic, payload in self.listen():
+            yield topic, payload
+
+    # --- NEW: Non-blocking receive for draining bursts ---
+    def try_recv_nowait(self) -> Tuple[str, dict]:
+        """
+        Return the next queued message (base topic stripped) without waiting.
+        Raises asyncio.QueueEmpty if nothing is queued.
+        """
+        topic, payload = self.incoming_messages.get_nowait()
+        return topic.removeprefix(f"{self.config.base_topic}/"), payload
 
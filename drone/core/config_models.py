@@ -1,9 +1,25 @@
 """
 Pydantic models for validating the mission_config.yaml file.
 """
-from typing import List, Tuple, Literal
+import hashlib
+import logging
+import pickle
+import sys
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Literal
+import yaml
+import pydantic
 from pydantic import BaseModel, Field
 
+# libyaml's C loader when PyYAML was built with it; same safe semantics
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+logger = logging.getLogger(__name__)
+
 # --- NEW: Comms Config ---
 
 class MqttConfig(BaseModel):
@@ -46,6 +62,9 @@ class VisualCameraConfig(BaseModel):
 class RecordingConfig(BaseModel):
     enabled: bool = True
     output_dir: str = "recordings"
+    # Fixed (min, max) Celsius for the recorded thermal colormap. None = stretch
+    # each frame to its own min/max (adaptive, but colors drift frame to frame).
+    thermal_range: Optional[Tuple[float, float]] = None
 
 class CameraConfig(BaseModel):
     thermal: ThermalCameraConfig
@@ -154,6 +173,13 @@ class ProbSearchConfig(BaseModel):
     drift_x_m_s: float = 0.5 # Ocean current simulation
     drift_y_m_s: float = 0.2
 
+    # P2P map gossip batching
+    gossip_batch_size: int = 5 # Observations per fleet/map/update_batch message
+    gossip_max_delay_s: float = 5.0 # Max time an observation waits in the buffer
+    # Inbound no-detection gossip is ignored for cells already below
+    # gossip_skip_ratio x the uniform prior (0 disables the short-circuit)
+    gossip_skip_ratio: float = 0.01
+
 # --- Top-Level Settings Model ---
 
 class Settings(BaseModel):
@@ -173,3 +199,49 @@ class Settings(BaseModel):
     lawnmower: LawnmowerConfig = Field(default_factory=LawnmowerConfig)
     orbit: OrbitConfig = Field(default_factory=OrbitConfig)
     prob_search: ProbSearchConfig = Field(default_factory=ProbSearchConfig) # NEW
+
+    @cached_property
+    def drones_by_id(self) -> Dict[str, DroneConfig]:
+        """Drone configs keyed by ID (built once, on first access)."""
+        return {d.id: d for d in self.drones}
+
+# --- Cached loading ---
+
+# Validated Settings pickled per config version, so a restart skips YAML
+# parsing and validation. Shared by the drone and hub entry points.
+SETTINGS_CACHE_DIR = Path.home() / ".cache" / "drone-mob"
+
+def _settings_cache_path(raw_config: bytes) -> Path:
+    """Cache file keyed on the config bytes and the schema module that validates them."""
+    h = hashlib.blake2b(raw_config, digest_size=16)
+    h.update(Path(__file__).read_bytes()) # Schema change = new key
+    # The hub imports this module as drone.core.config_models, the drone as
+    # core.config_models; their pickles name different classes
+    h.update(__name__.encode())
+    # Pickled models carry pydantic internals; a new pydantic (or Python) must revalidate
+    h.update(f"{pydantic.VERSION}|{sys.version_info[:2]}".encode())
+    return SETTINGS_CACHE_DIR / f"settings_{h.hexdigest()}.pkl"
+
+def load_settings_cached(config_file: Path) -> Settings:
+    """
+    Load and validate a mission config, through the settings cache.
+    Raises like open()/yaml/pydantic do; failing to write the cache is only logged.
+    """
+    raw_config = Path(config_file).read_bytes()
+    cache_file = _settings_cache_path(raw_config)
+    try:
+        settings = pickle.loads(cache_file.read_bytes())
+        if isinstance(settings, Settings):
+            return settings
+    except Exception:
+        pass # No (usable) cache entry; validate below
+    
+    config_data = yaml.load(raw_config, Loader=_YamlLoader)
+    settings = Settings(**config_data)
+    
+    try:
+        SETTINGS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_bytes(pickle.dumps(settings, pickle.HIGHEST_PROTOCOL))
+    except OSError as e:
+        logger.warning("[Config] Could not write settings cache: %s", e)
+    return settings
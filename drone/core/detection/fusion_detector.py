@@ -11,6 +11,7 @@ from .thermal_detector import ThermalDetector
 from .visual_detector import VisualDetector
 from .tracker import KalmanTracker # NEW
 from ..config_models import DetectionConfig
+from ..position import PositionArray
 
 class FusionDetector:
     """Fuses thermal and visual detections over time using a Kalman Tracker."""
@@ -40,9 +41,13 @@ class FusionDetector:
         Returns a list of stable, tracked detections.
         """
         # 1. Get new detections from both sensors concurrently
+        # --- FIX: The detectors are synchronous (gather() rejected their lists).
+        # Each runs in a worker thread instead: the OpenCV/NumPy (and numba,
+        # nogil) kernels release the GIL, so the two use separate cores and
+        # the event loop is not blocked for the frame's detection time.
         thermal_detections, visual_detections = await asyncio.gather(
-            self.thermal_detector.detect(dual_frame.thermal),
-            self.visual_detector.detect(dual_frame.visual)
+            asyncio.to_thread(self.thermal_detector.detect, dual_frame.thermal),
+            asyncio.to_thread(self.visual_detector.detect, dual_frame.visual)
         )
         all_detections = thermal_detections + visual_detections
         
@@ -74,26 +79,29 @@ class FusionDetector:
         matched_track_indices = set()
         matched_det_indices = set()
         
-        for t_idx, track in enumerate(self.tracks):
-            track_pos = track.get_pos()
-            best_dist = float('inf')
-            best_det_idx = -1
+        if self.tracks and detections:
+            # --- CHANGED: All track-to-detection squared distances in one broadcast
+            # (tracks x detections), gated against the squared threshold; no sqrt.
+            # Image positions sit on the z=0 plane; PositionArray holds them as
+            # float32, ample for pixel coordinates.
+            track_xy = np.array([track.get_pos() for track in self.tracks])
+            det_xy = np.array([det.position_image for det in detections])
+            track_batch = PositionArray(track_xy[:, 0], track_xy[:, 1], np.zeros(len(track_xy)))
+            det_batch = PositionArray(det_xy[:, 0], det_xy[:, 1], np.zeros(len(det_xy)))
+            d2 = track_batch.sq_distances_to(det_batch)
+            d2[d2 >= self.association_threshold ** 2] = np.inf # Out of gate
             
-            for d_idx, det in enumerate(detections):
-                if d_idx in matched_det_indices:
-                    continue # This detection is already matched
+            for t_idx, track in enumerate(self.tracks):
+                row = d2[t_idx]
+                best_det_idx = int(np.argmin(row)) # First of any ties, as before
+                if row[best_det_idx] == np.inf:
+                    continue # Nothing (left) within the gate
                 
-                dist = np.linalg.norm(np.array(track_pos) - np.array(det.position_image))
-                
-                if dist < self.association_threshold and dist < best_dist:
-                    best_dist = dist
-                    best_det_idx = d_idx
-            
-            # If we found a match, update the track
-            if best_det_idx != -1:
+                # Found a match: update the track, and retire the detection
                 track.update(detections[best_det_idx])
                 matched_track_indices.add(t_idx)
                 matched_det_indices.add(best_det_idx)
+                d2[:, best_det_idx] = np.inf
 
         # 3. Create new tracks for unmatched detections
         for d_idx, det in enumerate(detections):
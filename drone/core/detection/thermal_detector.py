@@ -1,10 +1,128 @@
 """
 Temperature threshold-based thermal detection
 """
+import cv2
 import numpy as np
+from dataclasses import dataclass, fields
 from typing import List
 from ..cameras.base import ThermalFrame, Detection
 
+# --- NEW: Optional JIT for the blob scoring kernel (pip install drone-mob[numba])
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+@dataclass(slots=True, frozen=True)
+class BlobBatch:
+    """
+    Struct-of-arrays view of a frame's blobs: one 1-D array per statistic,
+    index i across all fields describing blob i. Scoring reads only the
+    columns it needs.
+    """
+    area: np.ndarray
+    peak_temp: np.ndarray
+    avg_temp: np.ndarray
+    center_x: np.ndarray
+    center_y: np.ndarray
+    x_min: np.ndarray
+    y_min: np.ndarray
+    width: np.ndarray
+    height: np.ndarray
+
+    @classmethod
+    def empty(cls) -> 'BlobBatch':
+        return cls(*(np.empty(0) for _ in fields(cls)))
+
+    def select(self, keep: np.ndarray) -> 'BlobBatch':
+        """Subset by boolean mask or index array"""
+        return BlobBatch(*(getattr(self, f.name)[keep] for f in fields(self)))
+
+    def __len__(self) -> int:
+        return len(self.area)
+
+def blob_stats(temps: np.ndarray, mask: np.ndarray, min_area: int, max_area: int,
+               labels: np.ndarray = None) -> BlobBatch:
+    """
+    Pure-numeric blob kernel: label `mask` and return the stats of every blob
+    whose pixel count is within [min_area, max_area].
+    No Python loop over blobs: geometry comes from connectedComponentsWithStats,
+    temperatures from labeled reductions (bincount / maximum.at).
+    `labels` is an optional int32 buffer of at least mask's size to label into.
+    """
+    # --- NEW: Only label the bounding box of the hot pixels. Thermal scenes are
+    # mostly cold water, so this skips most of the frame (all of it when empty).
+    mask8 = mask.view(np.uint8)
+    x0, y0, w, h = cv2.boundingRect(mask8)
+    if w == 0:
+        return BlobBatch.empty()
+    roi = mask8[y0:y0 + h, x0:x0 + w]
+    if labels is not None:
+        labels = labels.reshape(-1)[:h * w].reshape(h, w) # Contiguous view of the buffer
+    
+    # --- CHANGED: OpenCV labels and measures (area, bbox, centroid) in one pass.
+    # 4-connectivity, as scipy.ndimage.label used before.
+    num_labels, labeled_array, cc_stats, centroids = cv2.connectedComponentsWithStats(
+        roi, labels=labels, connectivity=4, ltype=cv2.CV_32S
+    )
+    
+    areas = cc_stats[:, cv2.CC_STAT_AREA]
+    keep = (areas >= min_area) & (areas <= max_area)
+    keep[0] = False # Background
+    if not keep.any():
+        return BlobBatch.empty()
+    
+    # Temperatures still need labeled reductions, over the hot pixels only
+    ys, xs = np.nonzero(roi)
+    lbl = labeled_array[ys, xs]
+    hot = temps[ys + y0, xs + x0]
+    
+    means = np.bincount(lbl, weights=hot, minlength=num_labels) / np.maximum(areas, 1)
+    
+    # Per-label peak: unbuffered scatter-max in one pass over the hot pixels
+    # (no argsort to group them by label; ufunc.at is a fast loop since NumPy 1.25)
+    peaks = np.full(num_labels, -np.inf)
+    np.maximum.at(peaks, lbl, hot)
+    
+    # ROI-relative geometry back to frame coordinates
+    return BlobBatch(
+        area=areas[keep], peak_temp=peaks[keep], avg_temp=means[keep],
+        center_x=centroids[keep, 0] + x0, center_y=centroids[keep, 1] + y0,
+        x_min=cc_stats[keep, cv2.CC_STAT_LEFT] + x0, y_min=cc_stats[keep, cv2.CC_STAT_TOP] + y0,
+        # Extent-minus-one, as the detector has always reported it
+        width=cc_stats[keep, cv2.CC_STAT_WIDTH] - 1, height=cc_stats[keep, cv2.CC_STAT_HEIGHT] - 1,
+    )
+
+# 0.3 * size_score + 0.2 * shape_score, indexed by (size_ok << 1) | shape_ok
+_SIZE_SHAPE_SCORE = np.array([
+    0.3 * 0.5 + 0.2 * 0.7, # Neither
+    0.3 * 0.5 + 0.2 * 1.0, # Shape only
+    0.3 * 1.0 + 0.2 * 0.7, # Size only
+    0.3 * 1.0 + 0.2 * 1.0, # Both
+])
+
+def _score_kernel(area, peak_temp, width, height, water_temp, confidence, is_person):
+    """
+    Scalar blob scoring loop, filling `confidence` / `is_person` in place.
+    Only used JIT-compiled (see _score_kernel_jit); same math as _score_blobs.
+    """
+    for i in range(area.shape[0]):
+        a = area[i]
+        size_score = 1.0 if 50.0 <= a <= 500.0 else 0.5
+        temp_score = min(1.0, (peak_temp[i] - water_temp) / 25.0)
+        w = width[i]
+        h = height[i]
+        aspect_ratio = max(w, h) / (min(w, h) + 1.0)
+        shape_score = 1.0 if 1.2 <= aspect_ratio <= 3.0 else 0.7
+        # Summed in the same order as _SIZE_SHAPE_SCORE, so both paths agree exactly
+        c = min(1.0, (size_score * 0.3 + shape_score * 0.2) + temp_score * 0.5)
+        confidence[i] = c
+        is_person[i] = c > 0.7 and peak_temp[i] > water_temp + 15.0
+
+# One fused compiled loop instead of ~15 temporary-array NumPy ops per frame.
+# nogil: FusionDetector runs the thermal and visual detectors on worker threads.
+_score_kernel_jit = njit(cache=True, nogil=True)(_score_kernel) if njit is not None else None
+
 class ThermalDetector:
     """Simple threshold-based thermal detection"""
     
@@ -27,6 +145,16 @@ class ThermalDetector:
         self.estimated_water_temp = None
         self.water_temp_samples = []
         self.max_samples = 10
+        self._q8 = None # uint8 quantization buffer for the percentile histogram
+        # --- NEW: Reused per-frame buffers (hot mask, blob labels), sized on first frame
+        self._mask = None
+        self._labels = None
+        
+        if _score_kernel_jit is not None:
+            # Compile now (or load from cache) rather than on the first frame in flight
+            self.estimated_water_temp = 0.0
+            self._score_blobs(BlobBatch.empty())
+            self.estimated_water_temp = None
     
     def detect(self, frame: ThermalFrame) -> List[Detection]:
         """Detect heat signatures in thermal frame"""
@@ -39,20 +167,19 @@ class ThermalDetector:
         
         # Find pixels above threshold
         threshold_temp = self.estimated_water_temp + self.temp_threshold
-        hot_mask = frame.temperature_array > threshold_temp
-        
-        # Find connected components (blobs)
-        detections = self._find_blobs(frame, hot_mask, threshold_temp)
+        temps = frame.temperature_array
+        if self._mask is None or self._mask.shape != temps.shape:
+            self._mask = np.empty(temps.shape, dtype=bool)
+            self._labels = np.empty(temps.shape, dtype=np.int32)
+        hot_mask = np.greater(temps, threshold_temp, out=self._mask)
         
-        # Filter by confidence
-        detections = [d for d in detections if d.confidence >= self.min_confidence]
-        
-        return detections
+        # Find connected components (blobs), already filtered by confidence
+        return self._find_blobs(frame, hot_mask, threshold_temp)
     
     def _update_water_temp_estimate(self, frame: ThermalFrame):
         """Estimate water temperature from frame"""
         # Use 10th percentile as water temperature estimate
-        water_temp = np.percentile(frame.temperature_array, 10)
+        water_temp = self._quantized_percentile(frame, 0.10)
         
         self.water_temp_samples.append(water_temp)
         if len(self.water_temp_samples) > self.max_samples:
@@ -60,90 +187,110 @@ class ThermalDetector:
         
         self.estimated_water_temp = np.mean(self.water_temp_samples)
     
+    def _quantized_percentile(self, frame: ThermalFrame, q: float) -> float:
+        """
+        Percentile of the frame's temperatures from a 256-bin histogram.
+        The frame is quantized to uint8 over [min_temp, max_temp] (one cv2 pass),
+        avoiding np.percentile's partition of the full float frame; the result is
+        interpolated within its bin. It stays inside the true value's bin, so it is
+        off by less than one bin (span/255), and in practice by under half a bin
+        (span/510, ~0.012 C at a 6 C span). The detection threshold follows it, so
+        pixels right at the threshold edge can differ from an exact percentile.
+        """
+        temps = frame.temperature_array
+        lo = frame.min_temp
+        scale = 255.0 / max(frame.max_temp - lo, 1e-6)
+        if self._q8 is None or self._q8.shape != temps.shape:
+            self._q8 = np.empty(temps.shape, np.uint8)
+        cv2.convertScaleAbs(temps, self._q8, alpha=scale, beta=-lo * scale) # Rounds to nearest bin
+        
+        hist = cv2.calcHist([self._q8], [0], None, [256], [0, 256]).ravel()
+        cdf = np.cumsum(hist)
+        target = q * temps.size
+        k = int(np.searchsorted(cdf, target))
+        below = cdf[k - 1] if k else 0.0
+        position = k - 0.5 + (target - below) / hist[k] # Bin k covers [k - 0.5, k + 0.5)
+        return lo + position / scale
+    
     def _find_blobs(self, frame: ThermalFrame, mask: np.ndarray, threshold_temp: float) -> List[Detection]:
         """Find connected components in binary mask"""
-        from scipy import ndimage
+        # --- CHANGED: Numeric work lives in blob_stats(); this only scores and wraps rows
+        blobs = blob_stats(frame.temperature_array, mask, self.min_area, self.max_area, self._labels)
+        
+        # Score every blob at once, and drop low-confidence ones before any
+        # Detection objects are built
+        confidence, is_person = self._score_blobs(blobs)
+        keep = confidence >= self.min_confidence
+        blobs, confidence, is_person = blobs.select(keep), confidence[keep], is_person[keep]
         
-        # Label connected components
-        labeled_array, num_features = ndimage.label(mask)
+        # Per-frame values computed once here, so the loop body reads no attributes
+        temp_above_water = blobs.peak_temp - self.estimated_water_temp
         
         detections = []
         
-        for label_id in range(1, num_features + 1):
-            # Get pixels for this blob
-            blob_mask = labeled_array == label_id
-            blob_pixels = np.sum(blob_mask)
-            
-            # Filter by size
-            if blob_pixels < self.min_area or blob_pixels > self.max_area:
-                continue
-            
-            # Get blob properties
-            blob_temps = frame.temperature_array[blob_mask]
-            peak_temp = np.max(blob_temps)
-            avg_temp = np.mean(blob_temps)
-            
-            # Find centroid
-            y_coords, x_coords = np.where(blob_mask)
-            center_x = int(np.mean(x_coords))
-            center_y = int(np.mean(y_coords))
-            
-            # Bounding box
-            x_min, x_max = int(np.min(x_coords)), int(np.max(x_coords))
-            y_min, y_max = int(np.min(y_coords)), int(np.max(y_coords))
-            width = x_max - x_min
-            height = y_max - y_min
-            
-            # Calculate confidence score
-            confidence = self._calculate_confidence(
-                blob_pixels, peak_temp, avg_temp, width, height
-            )
-            
-            # Classify as person based on features
-            is_person = self._classify_person(
-                blob_pixels, peak_temp, width, height, confidence
-            )
-            
+        for area, peak_temp, avg_temp, above_water, center_x, center_y, x_min, y_min, width, height, conf, person in zip(
+                blobs.area.tolist(), blobs.peak_temp.tolist(), blobs.avg_temp.tolist(),
+                temp_above_water.tolist(),
+                blobs.center_x.tolist(), blobs.center_y.tolist(), blobs.x_min.tolist(),
+                blobs.y_min.tolist(), blobs.width.tolist(), blobs.height.tolist(),
+                confidence.tolist(), is_person.tolist()):
             detection = Detection(
-                position_image=(center_x, center_y),
+                position_image=(int(center_x), int(center_y)),
                 position_world=None,  # Will be calculated by mission controller
-                confidence=confidence,
-                is_person=is_person,
+                confidence=conf,
+                is_person=person,
                 source='thermal',
                 metadata={
                     'temperature': peak_temp,
                     'avg_temperature': avg_temp,
-                    'temp_above_water': peak_temp - self.estimated_water_temp,
-                    'blob_size': blob_pixels,
-                    'bounding_box': (x_min, y_min, width, height)
+                    'temp_above_water': above_water,
+                    'blob_size': int(area),
+                    'bounding_box': (int(x_min), int(y_min), int(width), int(height))
                 }
             )
             detections.append(detection)
         
         return detections
     
-    def _calculate_confidence(self, area: int, peak_temp: float, avg_temp: float, 
-                             width: int, height: int) -> float:
-        """Calculate detection confidence based on features"""
-        # Size score (person should be 50-500 pixels)
-        size_score = 1.0 if 50 <= area <= 500 else 0.5
+    def _score_blobs(self, blobs: BlobBatch):
+        """
+        Vectorized confidence and person classification for a BlobBatch.
+        Returns (confidence, is_person) arrays, one entry per blob.
+        """
+        area = blobs.area
+        peak_temp = blobs.peak_temp
+        width = blobs.width
+        height = blobs.height
+        
+        if _score_kernel_jit is not None:
+            n = len(blobs)
+            confidence = np.empty(n)
+            is_person = np.empty(n, dtype=np.bool_)
+            # float64 throughout so a single compiled specialization is used
+            _score_kernel_jit(
+                area.astype(np.float64), peak_temp.astype(np.float64),
+                width.astype(np.float64), height.astype(np.float64),
+                float(self.estimated_water_temp), confidence, is_person,
+            )
+            return confidence, is_person
+        temp_above_water = peak_temp - self.estimated_water_temp
+        
+        # Size predicate (person should be 50-500 pixels)
+        size_ok = (area >= 50) & (area <= 500)
         
         # Temperature score (higher temp = higher confidence)
-        temp_score = min(1.0, (peak_temp - self.estimated_water_temp) / 25.0)
+        temp_score = np.minimum(1.0, temp_above_water / 25.0)
         
-        # Shape score (person should be somewhat elongated)
-        aspect_ratio = max(width, height) / (min(width, height) + 1)
-        shape_score = 1.0 if 1.2 <= aspect_ratio <= 3.0 else 0.7
+        # Shape predicate (person should be somewhat elongated)
+        aspect_ratio = np.maximum(width, height) / (np.minimum(width, height) + 1)
+        shape_ok = (aspect_ratio >= 1.2) & (aspect_ratio <= 3.0)
         
-        # Combined confidence
-        confidence = (size_score * 0.3 + temp_score * 0.5 + shape_score * 0.2)
+        # --- CHANGED: Weighted size + shape scores come from one table gather
+        # keyed on the two predicate bits, instead of two np.where passes
+        key = (size_ok.view(np.uint8) << 1) | shape_ok.view(np.uint8)
+        confidence = np.minimum(1.0, _SIZE_SHAPE_SCORE[key] + temp_score * 0.5)
         
-        return min(1.0, confidence)
-    
-    def _classify_person(self, area: int, peak_temp: float, width: int, 
-                         height: int, confidence: float) -> bool:
-        """Classify if detection is likely a person"""
-        # Simple heuristic: if confidence is high and temp is warm enough
-        if confidence > 0.7 and peak_temp > (self.estimated_water_temp + 15):
-            return True
-        return False
\ No newline at end of file
+        # Person: high confidence and warm enough
+        is_person = (confidence > 0.7) & (peak_temp > self.estimated_water_temp + 15)
+        
+        return confidence, is_person
@@ -107,31 +107,29 @@ def _analyze_blobs(mask: np.ndarray, method_name: str) -> Dict[str, Any]:
     """Helper function to analyze connected components in a mask"""
     num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mask)
     
-    bounding_boxes = []
-    total_confidence = 0
-    valid_detections = 0
-    
-    for i in range(1, num_labels):
-        area = stats[i, cv2.CC_STAT_AREA]
-        width = stats[i, cv2.CC_STAT_WIDTH]
-        height = stats[i, cv2.CC_STAT_HEIGHT]
-        aspect_ratio = max(width, height) / min(width, height) if min(width, height) > 0 else 0
-        
-        min_area, max_area = 100, 5000
-        min_ar, max_ar = 0.5, 3.0
-        
-        if min_area < area < max_area and min_ar < aspect_ratio < max_ar:
-            x, y, w, h = (stats[i, cv2.CC_STAT_LEFT], stats[i, cv2.CC_STAT_TOP],
-                         stats[i, cv2.CC_STAT_WIDTH], stats[i, cv2.CC_STAT_HEIGHT])
-            bounding_boxes.append((x, y, w, h))
-            
-            size_conf = 1.0 - abs(area - 1000) / 1000
-            shape_conf = 1.0 - min(abs(aspect_ratio - 1.5) / 2.0, 1.0)
-            confidence = (size_conf + shape_conf) / 2
-            total_confidence += max(confidence, 0)
-            valid_detections += 1
-    
-    avg_confidence = total_confidence / max(valid_detections, 1)
+    # --- CHANGED: Filter and score every component at once on the stats columns
+    # (boolean masks instead of a per-component Python loop with branches)
+    stats = stats[1:] # Drop the background component
+    area = stats[:, cv2.CC_STAT_AREA]
+    width = stats[:, cv2.CC_STAT_WIDTH]
+    height = stats[:, cv2.CC_STAT_HEIGHT]
+    short_side = np.minimum(width, height)
+    aspect_ratio = np.divide(np.maximum(width, height), short_side,
+                             out=np.zeros(len(stats)), where=short_side > 0)
+    
+    min_area, max_area = 100, 5000
+    min_ar, max_ar = 0.5, 3.0
+    valid = ((area > min_area) & (area < max_area) &
+             (aspect_ratio > min_ar) & (aspect_ratio < max_ar))
+    
+    size_conf = 1.0 - np.abs(area[valid] - 1000) / 1000
+    shape_conf = 1.0 - np.minimum(np.abs(aspect_ratio[valid] - 1.5) / 2.0, 1.0)
+    confidence = np.maximum((size_conf + shape_conf) / 2, 0)
+    
+    boxes = stats[valid][:, [cv2.CC_STAT_LEFT, cv2.CC_STAT_TOP, cv2.CC_STAT_WIDTH, cv2.CC_STAT_HEIGHT]]
+    bounding_boxes = [tuple(box) for box in boxes.tolist()]
+    
+    avg_confidence = float(confidence.sum()) / max(len(bounding_boxes), 1)
     return {"bounding_boxes": bounding_boxes, "confidence": avg_confidence, "method": method_name}
 
 def combine_detections(thermal_image: np.ndarray, 
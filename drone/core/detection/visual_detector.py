@@ -1,10 +1,34 @@
 """
 Visual camera detector for person confirmation
 """
+import cv2
 import numpy as np
 from typing import List
 from ..cameras.base import VisualFrame, Detection
 
+MOTION_CONFIDENCE = 0.5 # Motion alone is less reliable
+
+def _blob_centroids(mask: np.ndarray, values: np.ndarray = None):
+    """
+    Label `mask` and measure every blob in one connectedComponentsWithStats pass.
+    Returns per-label arrays (index 0 = background, always size 0):
+    sizes, centroid x, centroid y, and the mean of `values` if given.
+    """
+    # 4-connectivity, matching the scipy.ndimage.label default used before
+    num_labels, labeled_array, cc_stats, centroids = cv2.connectedComponentsWithStats(
+        mask.view(np.uint8), connectivity=4, ltype=cv2.CV_32S
+    )
+    sizes = cc_stats[:, cv2.CC_STAT_AREA].copy()
+    sizes[0] = 0
+    cx, cy = centroids[:, 0], centroids[:, 1]
+    if values is None:
+        return sizes, cx, cy
+    
+    ys, xs = np.nonzero(mask)
+    lbl = labeled_array[ys, xs]
+    means = np.bincount(lbl, weights=values[ys, xs], minlength=num_labels) / np.maximum(sizes, 1)
+    return sizes, cx, cy, means
+
 class VisualDetector:
     """Visual-based person detection for confirmation"""
     
@@ -40,20 +64,19 @@ class VisualDetector:
         
         self.previous_frame = frame
         
-        # Filter by confidence
-        detections = [d for d in detections if d.confidence >= self.min_confidence]
-        
+        # (Each method already dropped blobs below min_confidence)
         return detections
     
     def _detect_by_color(self, frame: VisualFrame) -> List[Detection]:
-        """Detect by skin color in RGB image"""
+        """Detect by skin color in an RGB or BGR image"""
         image = frame.image
+        r_idx, b_idx = (2, 0) if frame.pixel_order == 'bgr' else (0, 2)
         
         # Simple skin color detection in RGB
         # Skin tone typically: R > 95, G > 40, B > 20, R > G, R > B, |R-G| > 15
-        r = image[:, :, 0]
+        r = image[:, :, r_idx]
         g = image[:, :, 1]
-        b = image[:, :, 2]
+        b = image[:, :, b_idx]
         
         skin_mask = (
             (r > 95) & (g > 40) & (b > 20) &
@@ -62,31 +85,23 @@ class VisualDetector:
         )
         
         # Find blobs in skin mask
-        from scipy import ndimage
-        labeled_array, num_features = ndimage.label(skin_mask)
+        sizes, cx, cy = _blob_centroids(skin_mask)
+        
+        # --- CHANGED: Size filter and confidence over all labels at once; only
+        # blobs that pass both become Detection objects
+        # Calculate confidence based on size and color match quality
+        confidence = np.minimum(1.0, sizes / 1000.0) * 0.7
+        # Filter by size (person's head should be significant)
+        keep = np.flatnonzero((sizes >= 100) & (sizes <= 5000) & (confidence >= self.min_confidence))
         
         detections = []
         
-        for label_id in range(1, num_features + 1):
-            blob_mask = labeled_array == label_id
-            blob_size = np.sum(blob_mask)
-            
-            # Filter by size (person's head should be significant)
-            if blob_size < 100 or blob_size > 5000:
-                continue
-            
-            # Get centroid
-            y_coords, x_coords = np.where(blob_mask)
-            center_x = int(np.mean(x_coords))
-            center_y = int(np.mean(y_coords))
-            
-            # Calculate confidence based on size and color match quality
-            confidence = min(1.0, blob_size / 1000.0) * 0.7
-            
+        for blob_size, conf, x, y in zip(sizes[keep].tolist(), confidence[keep].tolist(),
+                                         cx[keep].tolist(), cy[keep].tolist()):
             detection = Detection(
-                position_image=(center_x, center_y),
+                position_image=(int(x), int(y)),
                 position_world=None,
-                confidence=confidence,
+                confidence=conf,
                 is_person=True,
                 source='visual_color',
                 metadata={
@@ -100,6 +115,10 @@ class VisualDetector:
     
     def _detect_by_motion(self, current_frame: VisualFrame, previous_frame: VisualFrame) -> List[Detection]:
         """Detect by motion between frames"""
+        # Every motion blob gets the same confidence: skip the frame difference
+        # entirely when that can never pass the filter
+        if MOTION_CONFIDENCE < self.min_confidence:
+            return []
         
         # Simple frame difference
         diff = np.abs(current_frame.image.astype(int) - previous_frame.image.astype(int))
@@ -108,35 +127,24 @@ class VisualDetector:
         # Threshold for significant motion
         motion_mask = motion_magnitude > 100
         
-        from scipy import ndimage
-        labeled_array, num_features = ndimage.label(motion_mask)
+        sizes, cx, cy, mean_motion = _blob_centroids(motion_mask, motion_magnitude)
+        
+        keep = np.flatnonzero(sizes >= 50) # Filter small motion
         
         detections = []
         
-        for label_id in range(1, num_features + 1):
-            blob_mask = labeled_array == label_id
-            blob_size = np.sum(blob_mask)
-            
-            if blob_size < 50:  # Filter small motion
-                continue
-            
-            y_coords, x_coords = np.where(blob_mask)
-            center_x = int(np.mean(x_coords))
-            center_y = int(np.mean(y_coords))
-            
-            confidence = 0.5  # Motion alone is less reliable
-            
+        for x, y, magnitude in zip(cx[keep].tolist(), cy[keep].tolist(), mean_motion[keep].tolist()):
             detection = Detection(
-                position_image=(center_x, center_y),
+                position_image=(int(x), int(y)),
                 position_world=None,
-                confidence=confidence,
+                confidence=MOTION_CONFIDENCE,
                 is_person=False,  # Motion could be anything
                 source='visual_motion',
                 metadata={
                     'detection_method': 'motion',
-                    'motion_magnitude': float(np.mean(motion_magnitude[blob_mask]))
+                    'motion_magnitude': magnitude
                 }
             )
             detections.append(detection)
         
-        return detections
\ No newline at end of file
+        return detections
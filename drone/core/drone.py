@@ -5,18 +5,44 @@ Includes Base, Simulated, and MAVLink implementations.
 
 import asyncio
 import time
-import json
 import random
 import math # <-- FIX: Added missing import
-from abc import ABC, abstractmethod
-from pydantic import BaseModel # <-- FIX: Was dataclass
+from typing import Protocol
+import numpy as np
+from pydantic import BaseModel, Field # <-- FIX: Was dataclass
 from .position import Position
 
+# --- NEW: Packed telemetry record for on-board storage ---
+# Attitude/battery/position don't need FP64; vehicle state and LED colour
+# are stored as uint8 codes. The Pydantic model stays the public API.
+
+VEHICLE_STATES = ("DISARMED", "ARMED", "TAKING_OFF", "GUIDED", "LOITER", "LANDING", "LAND", "MANUAL")
+LED_COLORS = ("off", "red", "green", "blue", "yellow", "white")
+UNKNOWN_CODE = 255
+
+STATE_CODES = {name: code for code, name in enumerate(VEHICLE_STATES)}
+LED_CODES = {name: code for code, name in enumerate(LED_COLORS)}
+
+TELEMETRY_DTYPE = np.dtype([
+    ('pos', '3f4'),
+    ('att', '3f4'),
+    ('battery', 'f4'),
+    ('state', 'u1'),
+    ('led', 'u1'),
+    ('connected', '?'),
+    ('last_hb', 'f8'),  # Epoch seconds, keeps full precision
+])
+
+HEALTH_HISTORY_LEN = 10
+
+# Vehicle states in which the motors are idle (no battery drain in simulation)
+_IDLE_STATES = frozenset({"DISARMED", "ARMED"})
+
 # --- Telemetry Dataclass (CHANGED to Pydantic BaseModel) ---
 
 class Telemetry(BaseModel): # <-- FIX: Was @dataclass
     """Holds the complete state of the drone. (pydantic model for .model_dump())"""
-    position: Position = Position(0, 0, 0)
+    position: Position = Field(default_factory=Position) # <-- FIX: Position takes keyword args only
     attitude_roll: float = 0.0
     attitude_pitch: float = 0.0
     attitude_yaw: float = 0.0
@@ -27,35 +53,34 @@ class Telemetry(BaseModel): # <-- FIX: Was @dataclass
     led_color: str = "off"
     last_heartbeat: float = 0.0
 
-# --- BaseFlightController Interface (No Change) ---
+    def to_record(self) -> tuple:
+        """Packs this snapshot into a tuple matching TELEMETRY_DTYPE."""
+        pos = self.position
+        return (
+            (pos.x, pos.y, pos.z),
+            (self.attitude_roll, self.attitude_pitch, self.attitude_yaw),
+            self.battery,
+            STATE_CODES.get(self.state, UNKNOWN_CODE),
+            LED_CODES.get(self.led_color, UNKNOWN_CODE),
+            self.is_connected,
+            self.last_heartbeat,
+        )
 
-class BaseFlightController(ABC):
-    """Abstract interface for a flight controller (real or simulated)."""
-    
-    @abstractmethod
-    async def connect(self) -> bool:
-        pass
-    @abstractmethod
-    async def disconnect(self) -> None:
-        pass
-    @abstractmethod
-    async def takeoff(self, altitude: float) -> bool:
-        pass
-    @abstractmethod
-    async def go_to(self, position: Position) -> bool:
-        pass
-    @abstractmethod
-    async def hover(self) -> bool:
-        pass
-    @abstractmethod
-    async def land(self) -> bool:
-        pass
-    @abstractmethod
-    async def set_led(self, color: str) -> None:
-        pass
-    @abstractmethod
-    async def get_telemetry(self) -> Telemetry:
-        pass
+# --- BaseFlightController Interface (CHANGED: ABC -> Protocol) ---
+
+class BaseFlightController(Protocol):
+    """
+    Structural interface for a flight controller (real or simulated).
+    Controllers don't inherit from this; any class with these methods fits.
+    """
+    async def connect(self) -> bool: ...
+    async def disconnect(self) -> None: ...
+    async def takeoff(self, altitude: float) -> bool: ...
+    async def go_to(self, position: Position) -> bool: ...
+    async def hover(self) -> bool: ...
+    async def land(self) -> bool: ...
+    async def set_led(self, color: str) -> None: ...
+    async def get_telemetry(self) -> Telemetry: ...
 
 # --- Drone Class (FIXED) ---
 
@@ -67,39 +92,57 @@ class Drone:
     def __init__(self, controller: BaseFlightController, drone_id: str = "drone_0"):
         self.id = drone_id
         self.controller = controller
+        # --- NEW: Bind controller methods once (skips an attribute lookup per command) ---
+        self._connect = controller.connect
+        self._disconnect = controller.disconnect
+        self._takeoff = controller.takeoff
+        self._go_to = controller.go_to
+        self._hover = controller.hover
+        self._land = controller.land
+        self._set_led = controller.set_led
+        self._get_telemetry = controller.get_telemetry
         self.telemetry = Telemetry()
-        self.health_history = []
+        # --- NEW: Fixed-size ring buffer of packed records (see TELEMETRY_DTYPE) ---
+        self._health_buf = np.recarray(HEALTH_HISTORY_LEN, dtype=TELEMETRY_DTYPE)
+        self._health_count = 0
+
+    @property
+    def health_history(self) -> np.recarray:
+        """Last HEALTH_HISTORY_LEN health snapshots, oldest first."""
+        if self._health_count < HEALTH_HISTORY_LEN:
+            return self._health_buf[:self._health_count]
+        return np.roll(self._health_buf, -(self._health_count % HEALTH_HISTORY_LEN))
 
     async def connect(self) -> bool:
-        success = await self.controller.connect()
+        success = await self._connect()
         self.telemetry.is_connected = success
         return success
 
     async def disconnect(self) -> None:
-        await self.controller.disconnect()
+        await self._disconnect()
         self.telemetry.is_connected = False
 
     async def takeoff(self, altitude: float) -> bool:
         # We no longer set telemetry.state here.
         # The controller's get_telemetry() is the source of truth.
-        return await self.controller.takeoff(altitude)
+        return await self._takeoff(altitude)
 
     async def go_to(self, position: Position) -> bool:
-        return await self.controller.go_to(position)
+        return await self._go_to(position)
 
     async def hover(self) -> bool:
-        return await self.controller.hover()
+        return await self._hover()
 
     async def land(self) -> bool:
-        return await self.controller.land()
+        return await self._land()
 
     async def set_led(self, color: str):
-        await self.controller.set_led(color)
+        await self._set_led(color)
         # self.telemetry.led_color = color # Let get_telemetry handle this
 
     async def update_telemetry(self) -> None:
         """Poll the controller for the latest state."""
-        self.telemetry = await self.controller.get_telemetry()
+        self.telemetry = await self._get_telemetry()
         self.telemetry.last_heartbeat = time.time()
         self.record_health()
 
@@ -113,13 +156,12 @@ class Drone:
 
     def record_health(self):
         """Record current health snapshot."""
-        self.health_history.append(self.telemetry)
-        if len(self.health_history) > 10:
-            self.health_history.pop(0)
+        self._health_buf[self._health_count % HEALTH_HISTORY_LEN] = self.telemetry.to_record()
+        self._health_count += 1
 
 # --- SimulatedFlightController Implementation (Updated) ---
 
-class SimulatedFlightController(BaseFlightController):
+class SimulatedFlightController:
     """
     Simulation of the flight controller.
     """
@@ -194,7 +236,7 @@ class SimulatedFlightController(BaseFlightController):
         await asyncio.sleep(0.01)
 
     async def get_telemetry(self) -> Telemetry:
-        if self._telemetry.state not in ["DISARMED", "ARMED"]:
+        if self._telemetry.state not in _IDLE_STATES:
             self._telemetry.battery -= 0.01
         
         # --- NEW: Simulate Local Operator Takeover ---
@@ -215,7 +257,7 @@ class SimulatedFlightController(BaseFlightController):
 
 # --- MavlinkFlightController Implementation (Updated) ---
 
-class MavlinkController(BaseFlightController):
+class MavlinkController:
     """
     Hardware implementation of the flight controller using MAVLink.
     (Simulated implementation of real-world logic)
@@ -312,7 +354,7 @@ class MavlinkController(BaseFlightController):
         #    self._telemetry.is_connected = False
         
         # --- Simulated MAVLink Implementation ---
-        if self._telemetry.state not in ["DISARMED", "ARMED"]:
+        if self._telemetry.state not in _IDLE_STATES:
             self._telemetry.battery -= 0.02
         
         # Simulate small position/attitude changes
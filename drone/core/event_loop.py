@@ -0,0 +1,30 @@
+"""
+Event loop selection for the Drone-MOB processes.
+
+uvloop is optional: it is used when installed (Linux/macOS) and we fall
+back to the default asyncio loop otherwise.
+"""
+import asyncio
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def install_fast_loop() -> bool:
+    """
+    Install uvloop as the asyncio event loop policy, if available.
+
+    Must be called before asyncio.run() (i.e. before any Drone, MqttClient
+    or asyncio.Queue is created), otherwise they bind to the default loop.
+
+    Returns:
+        True if uvloop was installed, False if using the default loop.
+    """
+    if uvloop is None:
+        print("[EventLoop] uvloop not installed, using default asyncio loop.")
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    print("[EventLoop] Using uvloop.")
+    return True
@@ -2,6 +2,7 @@
 Enhanced mission logger with incremental log files
 """
 
+import re
 import time
 from pathlib import Path
 from datetime import datetime
@@ -21,6 +22,8 @@ class MissionLogger:
         self.log_dir = Path(log_dir)
         self.max_logs = max_logs
         self.drone_id = drone_id # <-- ADDED
+        # --- NEW: Anchored on the escaped drone_id so IDs containing '_' parse correctly ---
+        self._mission_re = re.compile(rf"^{re.escape(self.drone_id)}_mission_(\d+)_")
         
         # Create logs directory if it doesn't exist
         self.log_dir.mkdir(exist_ok=True)
@@ -34,6 +37,8 @@ class MissionLogger:
         # Create summary index file path
         # --- FIX: Use drone_id in index file name ---
         self.index_file = self.log_dir / f"{self.drone_id}_mission_index.txt"
+        # --- NEW: Stat the index once; _update_index tracks it from here ---
+        self._index_initialized = self.index_file.exists()
         
         # Initialize log file with header
         self._write_header()
@@ -50,19 +55,9 @@ class MissionLogger:
         if not log_files:
             return 1
         
-        # Extract mission numbers from filenames
-        try:
-            last_file = log_files[-1].stem  # Get filename without extension
-            # Extract number from "drone-id_mission_NNNN_timestamp" format
-            mission_num = int(last_file.split('_')[2]) # <-- FIX: Index is 2
-            return mission_num + 1
-        except (IndexError, ValueError):
-            # Fallback for old format
-            try:
-                mission_num = int(last_file.split('_')[1])
-                return mission_num + 1
-            except (IndexError, ValueError):
-                return 1 # Default
+        # Extract number from "drone-id_mission_NNNN_timestamp" format
+        m = self._mission_re.match(log_files[-1].name)
+        return int(m.group(1)) + 1 if m else 1
     
     def _write_header(self):
         """Write log file header with metadata"""
@@ -138,12 +133,13 @@ Start Time: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
         )
         
         # Create index if it doesn't exist
-        if not self.index_file.exists():
+        if not self._index_initialized:
             with open(self.index_file, 'w') as f:
                 f.write(f"MISSION INDEX (Drone: {self.drone_id})\n")
                 f.write("="*100 + "\n")
                 f.write(f"{'Timestamp':<20} | {'Log File':<40} | {'Target':<10} | {'Iterations':<12} | {'Battery':<10}\n")
                 f.write("="*100 + "\n")
+            self._index_initialized = True
         
         # Append to index
         with open(self.index_file, 'a') as f:
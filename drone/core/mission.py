@@ -9,8 +9,12 @@ described in the "Cobalt drone" document.
 """
 
 import asyncio
+import math
+import sys
+import time
 import traceback
-from .drone import Drone
+import orjson
+from .drone import Drone, Telemetry
 from .position import Position
 from .logger import MissionLogger
 from .state_machine import MissionStateMachine, MissionPhase
@@ -29,6 +33,18 @@ except ImportError:
     print("Ensure 'prob_search.py' is moved to 'core/ai/prob_search.py'")
     ProbabilisticSearchManager = None
 
+# Phase groups for membership checks in hot loops (MissionPhase members hash by name)
+_GROUND_PHASES = frozenset({MissionPhase.IDLE, MissionPhase.PREFLIGHT})
+_SEARCH_PHASES = frozenset({MissionPhase.ROLE_SEARCH_PRIMARY, MissionPhase.ROLE_SEARCH_ASSIST})
+_DELIVERY_READY_PHASES = frozenset({MissionPhase.ROLE_EMERGENCY_STANDBY, MissionPhase.IDLE})
+
+# Gossip topics coalesced by _coalesce_map_updates, and its drain bound per pass
+# (the MQTT thread keeps enqueueing while we drain)
+_MAP_TOPICS = frozenset({"fleet/map/update", "fleet/map/update_batch"})
+MAP_COALESCE_MAX_DRAIN = 256
+
+HOME_ARRIVAL_RADIUS_M = 2.0 # Horizontal distance from the takeoff point that counts as home
+
 class MissionController:
     """
     Asynchronous mission controller for a *single* drone.
@@ -37,6 +53,21 @@ class MissionController:
     based on its configured role, as described in.
     """
     
+    # --- NEW: Slots for every attribute we own (fast, fixed-offset access).
+    # `state` is set by the state machine; its trigger methods (start_mission, ...)
+    # live on the class, so instances need no __dict__.
+    __slots__ = (
+        "drone", "dual_camera", "search_strategies", "flight_strategies",
+        "config", "logger", "mqtt", "target", "target_position",
+        "current_mission_type", "role", "high_battery_threshold",
+        "_telemetry_topic", "_telemetry_tmpl",
+        "_connect_msg", "_event_topic", "_pending_conf_prefix", "_standby_position",
+        "telemetry_logger", "search_behavior", "delivery_behavior",
+        "prob_search_manager", "_home_position", "_arrived_home_evt", "_phase_changed_evt",
+        "_error_q", "_gossip_buf", "_gossip_deadline",
+        "_phase_str", "state", "state_machine", "_mission_dispatch", "_topic_handlers",
+    )
+    
     def __init__(self, 
                  drone: Drone, 
                  dual_camera: DualCameraSystem | None,
@@ -57,12 +88,38 @@ class MissionController:
         self.target_position = None
         self.current_mission_type = "IDLE"
         self.role = self._get_role() # <-- NEW: Store role
+        # --- NEW: MOB standby point for payload drones (search area centre, built once) ---
+        area = config.strategies.search.area
+        self._standby_position = Position(x=area.x, y=area.y, z=30.0) # Standby altitude
         self.high_battery_threshold = 80.0 # From Cobalt doc
         
+        # --- NEW: Telemetry payload template, refilled in place every tick ---
+        # Same keys as Telemetry.model_dump() so GCS/Hub consumers are unchanged.
+        self._telemetry_topic = f"fleet/telemetry/{drone.id}"
+        self._telemetry_tmpl = dict.fromkeys(Telemetry.model_fields)
+        self._telemetry_tmpl["position"] = {"x": 0.0, "y": 0.0, "z": 0.0}
+        self._telemetry_tmpl["mission_phase"] = None
+        # --- NEW: Pre-encoded static MQTT payloads ---
+        self._connect_msg = orjson.dumps({"drone_id": drone.id, "role": self.role})
+        self._event_topic = f"fleet/event/{drone.id}"
+        # '{"type":"PENDING_CONFIRMATION","data":{"drone_id":"<id>"' -- closed in _request_operator_confirmation
+        self._pending_conf_prefix = orjson.dumps(
+            {"type": "PENDING_CONFIRMATION", "data": {"drone_id": drone.id}}
+        )[:-2]
+        
         self.telemetry_logger = None 
         self.search_behavior = None
         self.delivery_behavior = None
         self.prob_search_manager = None # <-- NEW: AI/Prob search manager
+        self._home_position: Position | None = None # Where the last takeoff started (RTL target)
+        # --- NEW: Event-driven waits (replace 1s polling loops) ---
+        self._arrived_home_evt = asyncio.Event()  # Set by _health_monitor while RETURNING
+        self._phase_changed_evt = asyncio.Event() # Set by the state machine on every transition
+        # --- NEW: Tracebacks waiting to be formatted by _drain_errors (bounded) ---
+        self._error_q: asyncio.Queue = asyncio.Queue(maxsize=32)
+        # --- NEW: Map observations waiting to be gossiped as one batch ---
+        self._gossip_buf: list[dict] = []
+        self._gossip_deadline = 0.0
 
         # Only create camera-dependent components if cameras exist
         if self.dual_camera:
@@ -95,19 +152,48 @@ class MissionController:
             self.logger.log("Role is SCOUT, but AI module not loaded. AI search disabled.", "error")
         # ----------------------------------------
         
+        # Cached self.state.value, refreshed by the state machine on every transition
+        self._phase_str = MissionPhase.IDLE.value
         self.state_machine = MissionStateMachine(self, mqtt_client)
+        self._mission_dispatch = self._build_dispatch()
+        # --- NEW: Topic -> handler; also the list of topics run() subscribes to ---
+        self._topic_handlers = {
+            "mission/start": self._on_mission_start,
+            # Per-drone topic: confirmations addressed to other drones never reach us
+            f"fleet/event/confirmation/{drone.id}": self._on_confirmation,
+            "fleet/event/target_found": self._on_target_found,
+            "fleet/map/update": self._on_map_update, # P2P Map Sharing
+            "fleet/map/update_batch": self._on_map_update_batch,
+        }
         
         self.logger.log(f"Initialized mission for {drone.id}", "info")
         self.logger.log(f"Hardware Role: {self.role.upper()}", "info")
 
     def _get_role(self) -> str:
         """Get the drone's innate hardware role from the config."""
-        for d in self.config.drones:
-            if d.id == self.drone.id:
-                return d.role
+        drone_cfg = self.config.drones_by_id.get(self.drone.id)
+        if drone_cfg:
+            return drone_cfg.role
         self.logger.log(f"FATAL: Drone ID '{self.drone.id}' not found in config.drones", "error")
         return "unknown"
 
+    def _build_dispatch(self) -> dict:
+        """Map (mission_type, role) from `mission/start` to its handler."""
+        return {
+            # --- Use Case 1: MOB (MAX PRIORITY) ---
+            ("MOB_EMERGENCY", "scout"): self._handle_mob_scout,
+            ("MOB_EMERGENCY", "payload"): self._handle_mob_payload,
+            ("MOB_EMERGENCY", "utility"): self._handle_mob_utility,
+            # --- Use Case 2: General Emergencies (L3) ---
+            ("GENERAL_EMERGENCY", "scout"): self._handle_emergency_scout,
+            ("GENERAL_EMERGENCY", "payload"): self._handle_emergency_payload,
+            ("GENERAL_EMERGENCY", "utility"): self._handle_emergency_utility,
+            # --- Use Case 3: Utility & Compliance (L1/L2) ---
+            ("UTILITY_HULL_INSPECTION", "utility"): self._handle_utility_task_utility,
+            ("UTILITY_HULL_INSPECTION", "scout"): self._handle_utility_task_scout,
+            ("UTILITY_HULL_INSPECTION", "payload"): self._handle_utility_task_payload,
+        }
+
     async def run(self) -> None:
         """
         Execute the main asynchronous P2P mission loop.
@@ -115,28 +201,28 @@ class MissionController:
         """
         try:
             # --- REFACTORED: Subscribe to global P2P topics ---
-            await self.mqtt.subscribe("mission/start")
-            await self.mqtt.subscribe("fleet/event/confirmation")
-            await self.mqtt.subscribe("fleet/event/target_found")
-            # --- NEW: P2P Map Sharing Topic ---
-            await self.mqtt.subscribe("fleet/map/update")
+            for topic in self._topic_handlers:
+                await self.mqtt.subscribe(topic)
             
             self.logger.log(f"Listening for P2P events...", "info")
             # --------------------------------------------------
             
-            await self.mqtt.publish("fleet/connect", {"drone_id": self.drone.id, "role": self.role})
+            await self.mqtt.publish_raw("fleet/connect", self._connect_msg)
 
-            await asyncio.gather(
-                self._p2p_event_listener(), # Listens for fleet messages
-                self._health_monitor()      # Monitors self and publishes telemetry
-            )
+            # --- CHANGED: TaskGroup instead of gather (Python 3.11+) ---
+            # A failing task cancels its sibling and errors arrive as one ExceptionGroup.
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._p2p_event_listener()) # Listens for fleet messages
+                tg.create_task(self._health_monitor())      # Monitors self and publishes telemetry
+                tg.create_task(self._drain_errors())        # Formats queued tracebacks off the hot path
 
-        except (KeyboardInterrupt, asyncio.CancelledError):
+        except* (KeyboardInterrupt, asyncio.CancelledError):
             self.logger.log("Mission interrupted by user/system", "warning")
             await self.trigger_emergency(event=None)
-        except Exception as e:
-            self.logger.log(f"Fatal mission error: {e}", "error")
-            traceback.print_exc()
+        except* Exception as eg:
+            for e in eg.exceptions:
+                self.logger.log(f"Fatal mission error: {e}", "error")
+            traceback.print_exception(eg)
             await self.trigger_emergency(event=None)
         finally:
             self.logger.log("Cleaning up resources...", "info")
@@ -151,124 +237,233 @@ class MissionController:
         Main P2P loop that waits for global events and triggers
         autonomous role-based actions based on.
         """
-        async for topic, payload in self.mqtt.listen():
-            try:
-                # --- Pre-emption Logic ---
-                # High-priority events (e.g., MOB) can interrupt
-                # low-priority states (e.g., IDLE, ROLE_UTILITY_TASK).
-                
-                if topic == "mission/start":
-                    mission_type = payload.get("type")
-                    self.logger.log(f"Received global mission/start event: {mission_type}", "info")
-                    
-                    # Store target position if provided (for General Emergency)
-                    if "position" in payload and payload["position"] is not None:
-                        self.target_position = Position(**payload["position"])
-
-                    # --- Use Case 1: MOB (MAX PRIORITY) ---
-                    if mission_type == "MOB_EMERGENCY":
-                        # All drones check their role and act
-                        if self.role == "scout":
-                            self.logger.log("MOB Event: Assuming ROLE_SEARCH_PRIMARY", "info")
-                            self.current_mission_type = "MOB_SEARCH"
-                            # AI search logic will be used in _run_search_step
-                            await self.start_mission()
-                        
-                        elif self.role == "payload":
-                            self.logger.log("MOB Event: Assuming ROLE_SEARCH_DELIVER (-> STANDBY)", "info")
-                            self.current_mission_type = "STANDBY" # Will launch and wait
-                            # Standby at safe altitude near home
-                            self.target_position = Position(**self.config.strategies.search.area.model_dump())
-                            self.target_position.z = 30.0 # Standby altitude
-                            await self.start_standby_mission()
-                        
-                        elif self.role == "utility":
-                            self.logger.log("MOB Event: Assuming ROLE_SEARCH_ASSIST", "info")
-                            self.current_mission_type = "MOB_SEARCH"
-                            self.search_behavior.search_strategy = self.search_strategies['lawnmower']
-                            await self.start_mission()
-
-                    # --- Use Case 2: General Emergencies (L3) ---
-                    elif mission_type == "GENERAL_EMERGENCY":
-                        if self.role == "scout":
-                            self.logger.log("Gen-Emerg Event: Assuming ROLE_EMERGENCY_EYES", "info")
-                            self.current_mission_type = "OVERWATCH"
-                            await self.start_overwatch_mission()
-                        
-                        elif self.role == "payload":
-                            self.logger.log("Gen-Emerg Event: Assuming ROLE_EMERGENCY_STANDBY", "info")
-                            self.current_mission_type = "STANDBY"
-                            self.target_position.z = 30.0 # Standby near event
-                            await self.start_standby_mission()
-                        
-                        elif self.role == "utility":
-                            self.logger.log("Gen-Emerg Event: Assuming ROLE_EMERGENCY_ASSIST", "info")
-                            if self.drone.telemetry.battery > self.config.health.min_battery_patrol_rtl:
-                                self.current_mission_type = "OVERWATCH"
-                                await self.start_overwatch_mission()
-                            else:
-                                self.logger.log("Utility battery low, ignoring Gen-Emerg.", "warning")
-
-                    # --- Use Case 3: Utility & Compliance (L1/L2) ---
-                    elif mission_type == "UTILITY_HULL_INSPECTION":
-                        if self.role == "utility":
-                            self.logger.log("Utility Event: Assuming ROLE_UTILITY_TASK", "info")
-                            self.current_mission_type = "PATROL"
-                            self.search_behavior.search_strategy = self.search_strategies['lawnmower']
-                            await self.start_patrol_mission()
-                        
-                        elif self.role == "scout":
-                            # Logic from: "only allows it to accept... if its battery is above a high threshold"
-                            if self.drone.telemetry.battery > self.high_battery_threshold:
-                                self.logger.log(f"Scout accepting Utility task (battery {self.drone.telemetry.battery}% > {self.high_battery_threshold}%)", "info")
-                                self.current_mission_type = "PATROL"
-                                self.search_behavior.search_strategy = self.search_strategies['lawnmower']
-                                await self.start_patrol_mission()
-                            else:
-                                self.logger.log(f"Scout battery {self.drone.telemetry.battery}% < {self.high_battery_threshold}%. Ignoring Utility task.", "warning")
-                        
-                        elif self.role == "payload":
-                            # Logic from: "This drone is forbidden from performing COMPLIANCE (Utility) tasks"
-                            self.logger.log("Payload role is FORBIDDEN from Utility tasks. Ignoring.", "warning")
-                            # Do nothing
-                
-                # --- P2P Event: Target Handoff ---
-                elif topic == "fleet/event/target_found":
-                    if self.role == "payload" and self.state in [MissionPhase.ROLE_EMERGENCY_STANDBY, MissionPhase.IDLE]:
-                        self.logger.log("Target found by another drone. Assuming ROLE_DELIVERING", "info")
-                        self.target_position = Position(**payload["position"])
-                        self.current_mission_type = "PAYLOAD_DELIVERY"
-                        await self.start_delivery_mission()
-
-                # --- P2P Event: Operator Confirmation ---
-                elif topic == "fleet/event/confirmation":
-                    target_drone = payload.get("drone_id")
-                    # Is this confirmation for *me*?
-                    if target_drone == self.drone.id:
-                        if payload.get("type") == "OPERATOR_CONFIRM_TARGET":
-                            if self.state == MissionPhase.TARGET_PENDING_CONFIRMATION:
-                                await self.confirm_target()
-                        elif payload.get("type") == "OPERATOR_REJECT_TARGET":
-                            if self.state == MissionPhase.TARGET_PENDING_CONFIRMATION:
-                                await self.reject_target()
-                
-                # --- P2P Event: Shared Map Update ---
-                elif topic == "fleet/map/update":
-                    source_drone = payload.get("drone_id")
-                    if source_drone != self.drone.id and self.prob_search_manager:
-                        # Update our local map with info from another drone
-                        # This is the "gossip algorithm"
-                        self.logger.log(f"Received map update from {source_drone}", "debug")
-                        self.prob_search_manager.update_map(
-                            drone_pos=Position(**payload["position"]),
-                            drone_altitude=payload["altitude"],
-                            has_detection=payload["has_detection"]
-                        )
+        # --- CHANGED: O(1) topic dispatch, see _topic_handlers ---
+        topic_handlers = self._topic_handlers
 
+        async def dispatch(topic: str, payload: dict):
+            handler = topic_handlers.get(topic)
+            if handler is None:
+                return
+            try:
+                await handler(payload)
             except Exception as e:
                 self.logger.log(f"Error in P2P listener: {e}", "error")
-                traceback.print_exc()
+                self._report_exception()
+
+        async for topic, payload in self.mqtt.listen():
+            if topic in _MAP_TOPICS and self.prob_search_manager:
+                # --- NEW: Coalesce a burst of map updates before applying them ---
+                batches, deferred = self._coalesce_map_updates(topic, payload)
+                for batch in batches:
+                    await dispatch("fleet/map/update_batch", batch)
+                for later_topic, later_payload in deferred:
+                    await dispatch(later_topic, later_payload)
+            else:
+                await dispatch(topic, payload)
+
+    def _coalesce_map_updates(self, first_topic: str, first: dict):
+        """
+        Drain up to MAP_COALESCE_MAX_DRAIN queued messages without waiting.
+        Samples from fleet/map/update and fleet/map/update_batch are reduced to
+        the latest per (source drone, grid cell) and regrouped into one
+        update_batch payload per drone; everything else (and malformed map
+        messages) is returned in arrival order to be handled afterwards.
+        """
+        world_to_cell = self.prob_search_manager.world_to_cell
+        pending = {}
+        deferred = []
+        
+        def add(topic: str, payload: dict):
+            try:
+                drone_id = payload.get("drone_id")
+                samples = (payload,) if topic == "fleet/map/update" else payload["samples"]
+                keyed = []
+                for sample in samples:
+                    pos = sample["position"]
+                    keyed.append(((drone_id, *world_to_cell(pos["x"], pos["y"])), sample))
+            except (KeyError, TypeError, AttributeError):
+                deferred.append((topic, payload)) # Malformed; let its handler report it
+                return
+            for key, sample in keyed:
+                pending.pop(key, None) # Re-insert so order follows the latest sample
+                pending[key] = sample
+        
+        add(first_topic, first)
+        for _ in range(MAP_COALESCE_MAX_DRAIN):
+            try:
+                topic, payload = self.mqtt.try_recv_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if topic in _MAP_TOPICS:
+                add(topic, payload)
+            else:
+                deferred.append((topic, payload))
+        
+        by_drone = {}
+        for (drone_id, _, _), sample in pending.items():
+            by_drone.setdefault(drone_id, []).append(sample)
+        batches = [{"drone_id": drone_id, "samples": samples} for drone_id, samples in by_drone.items()]
+        return batches, deferred
+
+    def _report_exception(self):
+        """Queue the current traceback for _drain_errors; dropped if the queue is full."""
+        try:
+            self._error_q.put_nowait(sys.exc_info())
+        except asyncio.QueueFull:
+            pass
+
+    async def _drain_errors(self):
+        """Format and log queued tracebacks, at most 10 per second."""
+        while True:
+            exc_info = await self._error_q.get()
+            trace = "".join(traceback.format_exception(*exc_info))
+            self.logger.log(trace[-2000:], "error")
+            await asyncio.sleep(0.1)
+
+    # --- Topic handlers ---
+    # Pre-emption Logic: high-priority events (e.g., MOB) can interrupt
+    # low-priority states (e.g., IDLE, ROLE_UTILITY_TASK).
+
+    async def _on_mission_start(self, payload: dict):
+        mission_type = payload.get("type")
+        self.logger.log(f"Received global mission/start event: {mission_type}", "info")
+        
+        # Store target position if provided (for General Emergency).
+        # Operator input relayed by the GCS, not a drone's model_dump(): validate it.
+        if "position" in payload and payload["position"] is not None:
+            self.target_position = Position(**payload["position"])
+
+        # O(1) (mission_type, role) dispatch, see _build_dispatch
+        handler = self._mission_dispatch.get((mission_type, self.role))
+        if handler:
+            await handler(payload)
+
+    async def _on_target_found(self, payload: dict):
+        """P2P Event: Target Handoff."""
+        if self.role == "payload" and self.state in _DELIVERY_READY_PHASES:
+            self.logger.log("Target found by another drone. Assuming ROLE_DELIVERING", "info")
+            self.target_position = Position.from_trusted_dict(payload["position"])
+            self.current_mission_type = "PAYLOAD_DELIVERY"
+            await self.start_delivery_mission()
+
+    async def _on_confirmation(self, payload: dict):
+        """
+        P2P Event: Operator Confirmation.
+        Arrives on fleet/event/confirmation/{drone_id}, so it is always for *me*.
+        """
+        if self.state != MissionPhase.TARGET_PENDING_CONFIRMATION:
+            return
+        msg_type = payload.get("type")
+        if msg_type == "OPERATOR_CONFIRM_TARGET":
+            await self.confirm_target()
+        elif msg_type == "OPERATOR_REJECT_TARGET":
+            await self.reject_target()
+
+    async def _on_map_update(self, payload: dict):
+        """P2P Event: Shared Map Update."""
+        source_drone = payload.get("drone_id")
+        if source_drone != self.drone.id and self.prob_search_manager:
+            # Update our local map with info from another drone
+            # This is the "gossip algorithm"
+            self.logger.log(f"Received map update from {source_drone}", "debug")
+            # Convert to grid indices once; no Position object needed
+            pos = payload["position"]
+            row, col = self.prob_search_manager.world_to_cell(pos["x"], pos["y"])
+            has_detection = payload["has_detection"]
+            # A miss over an already-searched cell changes (almost) nothing
+            if not has_detection and self.prob_search_manager.is_cell_negligible(row, col):
+                return
+            self.prob_search_manager.update_map_at(
+                row, col,
+                drone_altitude=payload["altitude"],
+                has_detection=has_detection
+            )
+
+    async def _on_map_update_batch(self, payload: dict):
+        """P2P Event: Batched Shared Map Update (see _flush_gossip)."""
+        source_drone = payload.get("drone_id")
+        if source_drone != self.drone.id and self.prob_search_manager:
+            samples = payload["samples"]
+            self.logger.log(f"Received {len(samples)} map updates from {source_drone}", "debug")
+            world_to_cell = self.prob_search_manager.world_to_cell
+            update_map_at = self.prob_search_manager.update_map_at
+            is_cell_negligible = self.prob_search_manager.is_cell_negligible
+            for sample in samples:
+                pos = sample["position"]
+                row, col = world_to_cell(pos["x"], pos["y"])
+                has_detection = sample["has_detection"]
+                if not has_detection and is_cell_negligible(row, col):
+                    continue
+                update_map_at(row, col, sample["altitude"], has_detection)
+
+    # --- mission/start handlers (one per (mission_type, role)) ---
+
+    async def _handle_mob_scout(self, payload: dict):
+        self.logger.log("MOB Event: Assuming ROLE_SEARCH_PRIMARY", "info")
+        self.current_mission_type = "MOB_SEARCH"
+        # AI search logic will be used in _run_search_step
+        await self.start_mission()
+
+    async def _handle_mob_payload(self, payload: dict):
+        self.logger.log("MOB Event: Assuming ROLE_SEARCH_DELIVER (-> STANDBY)", "info")
+        self.current_mission_type = "STANDBY" # Will launch and wait
+        # Standby at safe altitude near home
+        # Copy, since other handlers adjust target_position in place
+        self.target_position = self._standby_position.model_copy()
+        await self.start_standby_mission()
+
+    async def _handle_mob_utility(self, payload: dict):
+        self.logger.log("MOB Event: Assuming ROLE_SEARCH_ASSIST", "info")
+        self.current_mission_type = "MOB_SEARCH"
+        self.search_behavior.search_strategy = self.search_strategies['lawnmower']
+        await self.start_mission()
+
+    async def _handle_emergency_scout(self, payload: dict):
+        self.logger.log("Gen-Emerg Event: Assuming ROLE_EMERGENCY_EYES", "info")
+        self.current_mission_type = "OVERWATCH"
+        await self.start_overwatch_mission()
+
+    async def _handle_emergency_payload(self, payload: dict):
+        self.logger.log("Gen-Emerg Event: Assuming ROLE_EMERGENCY_STANDBY", "info")
+        self.current_mission_type = "STANDBY"
+        self.target_position.z = 30.0 # Standby near event
+        await self.start_standby_mission()
+
+    async def _handle_emergency_utility(self, payload: dict):
+        self.logger.log("Gen-Emerg Event: Assuming ROLE_EMERGENCY_ASSIST", "info")
+        if self.drone.telemetry.battery > self.config.health.min_battery_patrol_rtl:
+            self.current_mission_type = "OVERWATCH"
+            await self.start_overwatch_mission()
+        else:
+            self.logger.log("Utility battery low, ignoring Gen-Emerg.", "warning")
+
+    async def _handle_utility_task_utility(self, payload: dict):
+        self.logger.log("Utility Event: Assuming ROLE_UTILITY_TASK", "info")
+        self.current_mission_type = "PATROL"
+        self.search_behavior.search_strategy = self.search_strategies['lawnmower']
+        await self.start_patrol_mission()
+
+    async def _handle_utility_task_scout(self, payload: dict):
+        # Logic from: "only allows it to accept... if its battery is above a high threshold"
+        if self.drone.telemetry.battery > self.high_battery_threshold:
+            self.logger.log(f"Scout accepting Utility task (battery {self.drone.telemetry.battery}% > {self.high_battery_threshold}%)", "info")
+            self.current_mission_type = "PATROL"
+            self.search_behavior.search_strategy = self.search_strategies['lawnmower']
+            await self.start_patrol_mission()
+        else:
+            self.logger.log(f"Scout battery {self.drone.telemetry.battery}% < {self.high_battery_threshold}%. Ignoring Utility task.", "warning")
+
+    async def _handle_utility_task_payload(self, payload: dict):
+        # Logic from: "This drone is forbidden from performing COMPLIANCE (Utility) tasks"
+        self.logger.log("Payload role is FORBIDDEN from Utility tasks. Ignoring.", "warning")
 
+    def _is_home(self) -> bool:
+        """True once the drone is within HOME_ARRIVAL_RADIUS_M (horizontally) of its takeoff point."""
+        home = self._home_position
+        if home is None:
+            return False
+        pos = self.drone.telemetry.position
+        return math.hypot(pos.x - home.x, pos.y - home.y) <= HOME_ARRIVAL_RADIUS_M
 
     async def _health_monitor(self):
         """Periodic loop to update telemetry and check health."""
@@ -276,8 +471,10 @@ class MissionController:
             try:
                 # Always update telemetry, even on ground, to check battery
                 await self.drone.update_telemetry()
+                if self.state == MissionPhase.RETURNING and self._is_home():
+                    self._arrived_home_evt.set()
 
-                if self.state not in [MissionPhase.IDLE, MissionPhase.PREFLIGHT]:
+                if self.state not in _GROUND_PHASES:
                     
                     # --- Local Operator Takeover Logic (Level 2) ---
                     is_manual = self.drone.telemetry.state == "MANUAL"
@@ -298,19 +495,38 @@ class MissionController:
                     # Log to file if we have a logger
                     if self.telemetry_logger:
                         await self.telemetry_logger.log_snapshot(
-                            mission_state=self.state.value,
+                            mission_state=self._phase_str,
                             drone=self.drone,
-                            detections=self.search_behavior.get_last_detections() if self.search_behavior else []
+                            # search_behavior always exists alongside telemetry_logger
+                            detections=self.search_behavior.get_last_detections()
                         )
                 
                 # --- Always publish telemetry for GCS/Hub ---
-                telemetry_payload = self.drone.telemetry.model_dump()
-                telemetry_payload["mission_phase"] = self.state.value # Add this
+                # (CHANGED: fill the cached template instead of model_dump())
+                t = self.drone.telemetry
+                tmpl = self._telemetry_tmpl
+                pos = tmpl["position"]
+                pos["x"] = t.position.x
+                pos["y"] = t.position.y
+                pos["z"] = t.position.z
+                tmpl["attitude_roll"] = t.attitude_roll
+                tmpl["attitude_pitch"] = t.attitude_pitch
+                tmpl["attitude_yaw"] = t.attitude_yaw
+                tmpl["battery"] = t.battery
+                tmpl["is_connected"] = t.is_connected
+                tmpl["state"] = t.state
+                tmpl["led_color"] = t.led_color
+                tmpl["last_heartbeat"] = t.last_heartbeat
+                tmpl["mission_phase"] = self._phase_str
                 
-                await self.mqtt.publish(
-                    f"fleet/telemetry/{self.drone.id}",
-                    telemetry_payload
-                )
+                # Shielded: a state change cancelling us mustn't cut a publish mid-flight.
+                # QoS 0: a lost telemetry tick is superseded by the next one.
+                await asyncio.shield(self.mqtt.publish_raw(
+                    self._telemetry_topic,
+                    orjson.dumps(tmpl, option=orjson.OPT_SERIALIZE_NUMPY),
+                    qos=0,
+                    compress=True
+                ))
                 
                 await asyncio.sleep(1.0)
             
@@ -318,6 +534,7 @@ class MissionController:
                 break
             except Exception as e:
                 self.logger.log(f"Error in health monitor: {e}", "error")
+                self._report_exception()
                 await self.trigger_emergency(event=None)
 
     # --- State Machine Callbacks (Updated for P2P/AI) ---
@@ -325,15 +542,26 @@ class MissionController:
     async def _run_preflight(self, event):
         self.logger.log(f"Entering PREFLIGHT state for {self.current_mission_type}", "info")
         try:
-            if not await self.drone.connect():
+            # --- CHANGED: Bring up the flight link and the cameras concurrently
+            # instead of back-to-back; neither depends on the other.
+            needs_cameras = self.role in ["scout", "utility"]
+            if needs_cameras and not self.dual_camera:
+                raise Exception("Camera system failed to connect.")
+
+            if needs_cameras:
+                drone_ok, cameras_ok = await asyncio.gather(
+                    self.drone.connect(), self.dual_camera.connect()
+                )
+            else:
+                drone_ok, cameras_ok = await self.drone.connect(), True
+
+            if not drone_ok:
                  raise Exception("Drone failed to connect.")
+            if not cameras_ok:
+                raise Exception("Camera system failed to connect.")
             
             # Update telemetry right after connect to get battery
             await self.drone.update_telemetry()
-            
-            if self.role in ["scout", "utility"]:
-                if not self.dual_camera or not await self.dual_camera.connect():
-                    raise Exception("Camera system failed to connect.")
 
             if self.drone.telemetry.battery < self.config.health.min_battery_preflight:
                 raise Exception(f"{self.drone.id} - Low battery ({self.drone.telemetry.battery}%)")
@@ -363,6 +591,7 @@ class MissionController:
                 else: # Utility drone doing assist
                     alt = self.config.lawnmower.patrol_altitude
             
+            self._home_position = self.drone.telemetry.position.model_copy()
             if not await self.drone.takeoff(alt):
                 raise Exception("Takeoff command failed.")
             self.logger.log(f"Takeoff complete to {alt}m", "info")
@@ -378,44 +607,56 @@ class MissionController:
             await self.trigger_emergency(event=event)
             return
 
-        while self.state in [MissionPhase.ROLE_SEARCH_PRIMARY, MissionPhase.ROLE_SEARCH_ASSIST]:
+        use_ai_search = self.role == "scout" and self.prob_search_manager is not None
+        sb = self.search_behavior
+        if not use_ai_search:
+            # Utility (Assist) flies the lawnmower pattern; set it once, not per step
+            sb.search_strategy = self.search_strategies['lawnmower']
+
+        # Loop invariants bound to locals once (telemetry is re-read via `drone`)
+        drone = self.drone
+        psm = self.prob_search_manager
+        search_states = _SEARCH_PHASES
+
+        while self.state in search_states:
             try:
                 detection = None
                 
                 # --- NEW: AI-Driven Search for SCOUT ---
-                if self.role == "scout" and self.prob_search_manager:
-                    # 1. Evolve map for drift
-                    self.prob_search_manager.evolve_map(dt=1.0) # Assume 1s loop
-                    
-                    # 2. Get next AI waypoint
-                    next_wp = self.prob_search_manager.get_next_search_waypoint()
+                if use_ai_search:
+                    # 1-2. Evolve map for drift and pick the next AI waypoint.
+                    # Runs in a worker thread so telemetry and the health monitor
+                    # keep running meanwhile (gossip waits: this chain runs in the
+                    # listener task).
+                    next_wp = await asyncio.to_thread(psm.plan_next_waypoint, 1.0) # Assume 1s loop
                     self.logger.log(f"[AI Search] Flying to new waypoint: {next_wp}", "debug")
-                    await self.drone.go_to(next_wp)
+                    await drone.go_to(next_wp)
                     
                     # 3. Scan at waypoint
                     # We assume search_step() is a point-scan or short hover
-                    should_continue, detection = await self.search_behavior.search_step()
+                    should_continue, detection = await sb.search_step()
                     
                     # 4. Update AI map
-                    self.prob_search_manager.update_map(
-                        drone_pos=self.drone.telemetry.position,
-                        drone_altitude=self.drone.telemetry.position.z,
-                        has_detection=bool(detection)
+                    pos = drone.telemetry.position
+                    found = bool(detection)
+                    psm.update_map(
+                        drone_pos=pos,
+                        drone_altitude=pos.z,
+                        has_detection=found
                     )
                     
                     # 5. --- P2P SHARE ---
-                    # Broadcast our finding to the fleet
-                    await self.mqtt.publish("fleet/map/update", {
-                        "drone_id": self.drone.id,
-                        "position": self.drone.telemetry.position.model_dump(),
-                        "altitude": self.drone.telemetry.position.z,
-                        "has_detection": bool(detection)
+                    # Buffer our finding; it is broadcast to the fleet in batches
+                    self._queue_gossip({
+                        "position": pos.model_dump(),
+                        "altitude": pos.z,
+                        "has_detection": found
                     })
+                    await self._flush_gossip(force=found)
                 
                 # --- Original Lawnmower Search for UTILITY (Assist) ---
                 else:
-                    self.search_behavior.search_strategy = self.search_strategies['lawnmower']
-                    should_continue, detection = await self.search_behavior.search_step()
+                    should_continue, detection = await sb.search_step()
 
                 # --- Common logic ---
                 if detection:
@@ -432,6 +673,29 @@ class MissionController:
                 self.logger.log(f"Error during search step: {e}", "error")
                 await self.trigger_emergency(event=event)
                 break
+
+        # Don't leave observations stranded in the buffer when the search ends
+        await self._flush_gossip(force=True)
+
+    def _queue_gossip(self, sample: dict):
+        """Buffer one map observation for the next fleet/map/update_batch."""
+        if not self._gossip_buf:
+            self._gossip_deadline = time.monotonic() + self.config.prob_search.gossip_max_delay_s
+        self._gossip_buf.append(sample)
+
+    async def _flush_gossip(self, force: bool = False):
+        """Publish buffered observations once the batch is full or its deadline passed."""
+        if not self._gossip_buf:
+            return
+        if (not force
+                and len(self._gossip_buf) < self.config.prob_search.gossip_batch_size
+                and time.monotonic() < self._gossip_deadline):
+            return
+        samples, self._gossip_buf = self._gossip_buf, []
+        await self.mqtt.publish("fleet/map/update_batch", {
+            "drone_id": self.drone.id,
+            "samples": samples
+        })
     
     async def _run_patrol(self, event):
         self.logger.log(f"Entering PATROL state (Role: {self.state.value})", "info")
@@ -439,16 +703,21 @@ class MissionController:
             await self.trigger_emergency(event=event)
             return
             
-        self.search_behavior.search_strategy = self.search_strategies['lawnmower']
+        sb = self.search_behavior
+        sb.search_strategy = self.search_strategies['lawnmower']
+        # Loop invariants bound to locals once. The telemetry object itself is
+        # replaced on every update, so it is re-read through `drone` each pass.
+        drone = self.drone
+        min_batt = self.config.health.min_battery_patrol_rtl
         
         while self.state == MissionPhase.ROLE_UTILITY_TASK:
             try:
-                if self.drone.telemetry.battery < self.config.health.min_battery_patrol_rtl:
+                if drone.telemetry.battery < min_batt:
                     self.logger.log("Patrol battery low, returning to home.", "warning")
                     await self.patrol_battery_low()
                     break
                 
-                should_continue, detection = await self.search_behavior.search_step()
+                should_continue, detection = await sb.search_step()
                 
                 if detection:
                     self.logger.log("Sighting during patrol, logging but continuing.", "info")
@@ -467,18 +736,21 @@ class MissionController:
     async def _run_overwatch(self, event):
         self.logger.log(f"Entering OVERWATCH state (Role: {self.state.value})", "info")
         try:
-            self.search_behavior.search_strategy = self.search_strategies['orbit']
-            self.search_behavior.search_strategy.set_center(self.target_position)
+            sb = self.search_behavior
+            sb.search_strategy = self.search_strategies['orbit']
+            sb.search_strategy.set_center(self.target_position)
+            phase_changed = self._phase_changed_evt
 
             while self.state == MissionPhase.ROLE_EMERGENCY_EYES:
-                should_continue, detection = await self.search_behavior.search_step()
+                should_continue, detection = await sb.search_step()
                 if detection:
                     self.logger.log("Sighting during overwatch, logging.", "info")
                 
                 # Overwatch continues until a new event (e.g., MOB) pre-empts it
                 # or the operator sends a "return" command (not implemented)
-                # or it's pre-empted by low battery.
-                await asyncio.sleep(1.0)
+                # or it's pre-empted by low battery. A state change ends the pause early.
+                phase_changed.clear()
+                await self._wait_any(phase_changed, timeout=1.0)
                 
         except Exception as e:
             self.logger.log(f"Error during overwatch: {e}", "error")
@@ -492,7 +764,8 @@ class MissionController:
             # Drone will just hover here. The `_p2p_event_listener`
             # is waiting for the `fleet/event/target_found` message.
             while self.state == MissionPhase.ROLE_EMERGENCY_STANDBY:
-                await asyncio.sleep(1.0)
+                self._phase_changed_evt.clear()
+                await self._phase_changed_evt.wait()
                 
         except Exception as e:
             self.logger.log(f"Error during standby: {e}", "error")
@@ -516,14 +789,13 @@ class MissionController:
     async def _request_operator_confirmation(self, event):
         self.logger.log("Target sighted. Requesting operator confirmation...", "info")
         # Publish P2P event for GCS/Hub to see
-        await self.mqtt.publish(f"fleet/event/{self.drone.id}", {
-            "type": "PENDING_CONFIRMATION",
-            "data": { 
-                "drone_id": self.drone.id, 
-                "position": self.target.position_world.model_dump(), 
-                "confidence": self.target.confidence 
-            }
-        })
+        # Only the position/confidence are encoded here; the rest is pre-built in __init__
+        await self.mqtt.publish_raw(self._event_topic, b"".join((
+            self._pending_conf_prefix,
+            b',"position":', orjson.dumps(self.target.position_world.model_dump(), option=orjson.OPT_SERIALIZE_NUMPY),
+            b',"confidence":', orjson.dumps(self.target.confidence, option=orjson.OPT_SERIALIZE_NUMPY),
+            b'}}'
+        )))
         
     async def _handle_rejection(self, event):
         self.logger.log("Operator rejected target. Resuming search.", "warning")
@@ -558,21 +830,31 @@ class MissionController:
     async def _run_return_to_home(self, event):
         self.logger.log(f"Entering RETURNING state", "info")
         try:
+            self._arrived_home_evt.clear()
+            self._phase_changed_evt.clear()
             if not await self.drone.return_to_home():
                 raise Exception("RTL command failed.")
             self.logger.log("RTL command sent. Monitoring arrival.", "info")
             
-            while self.state == MissionPhase.RETURNING:
-                if self.drone.telemetry.is_home:
-                    self.logger.log("Arrived home.", "info")
-                    await self.arrived_home()
-                    break
-                await asyncio.sleep(1.0)
+            # Woken by _health_monitor on arrival, or by any state change (pre-emption)
+            await self._wait_any(self._arrived_home_evt, self._phase_changed_evt)
+            if self.state == MissionPhase.RETURNING and self._arrived_home_evt.is_set():
+                self.logger.log("Arrived home.", "info")
+                await self.arrived_home()
                 
         except Exception as e:
             self.logger.log(f"RTL failed: {e}", "error")
             await self.trigger_emergency(event=event)
 
+    async def _wait_any(self, *events: asyncio.Event, timeout: float | None = None):
+        """Wait until any of `events` is set (or `timeout` elapses)."""
+        waiters = [asyncio.create_task(evt.wait()) for evt in events]
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
     async def _run_land(self, event):
         self.logger.log(f"Entering LANDING state", "info")
         try:
@@ -592,9 +874,19 @@ class MissionController:
 
     async def _log_mission_summary(self, event):
         self.logger.log("Entering COMPLETED state", "info")
-        self.logger.log("Mission summary: [Summary details...]", "info")
         if self.target:
             self.logger.log(f"Target found at {self.target.position_world}", "info")
         else:
             self.logger.log("No target was confirmed.", "info")
+        # --- NEW: Counters are maintained by SearchBehavior as detections arrive
+        sb = self.search_behavior
+        summary = {
+            "Target found": "Yes" if self.target else "No",
+            "Final battery": f"{self.drone.telemetry.battery}%",
+        }
+        if sb:
+            summary["Search iterations"] = sb.iteration
+            summary["Detections"] = sb.detection_count
+            summary["Person detections"] = sb.person_count
+        self.logger.log_summary(summary)
         await self.mission_finished()
\ No newline at end of file
@@ -3,11 +3,18 @@ Navigation, Geolocation, and Coordinate Transformation Utilities.
 """
 import numpy as np
 import math
+from functools import lru_cache
 from typing import Tuple
 from .position import Position
 from .drone import Telemetry
 from .config_models import CameraIntrinsics # <-- FIX: Was CameraIntrinsicsConfig
 
+# --- NEW: Optional JIT for single-pixel geolocation (pip install drone-mob[numba])
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 class CameraIntrinsicsHelper: # <-- FIX: Renamed class to avoid conflict
     """A helper class to hold camera intrinsic parameters."""
     def __init__(self, config: CameraIntrinsics): # <-- FIX: Was CameraIntrinsicsConfig
@@ -24,6 +31,12 @@ class CameraIntrinsicsHelper: # <-- FIX: Renamed class to avoid conflict
             [0, 1/self.fy, -self.cy/self.fy],
             [0, 0, 1]
         ])
+        
+        if _ground_hit_jit is not None:
+            # Compile (or load from cache) now, not on the event loop at the
+            # first confirmed detection. Same argument types as the real call.
+            A, b = _pixel_ray_affine(self, 0.0, 0.0, 0.0)
+            _ground_hit_jit(0.0, 0.0, A, b, 0.0, 0.0, 0.0, 0.0)
 
 class Attitude:
     """A helper class to hold attitude in radians."""
@@ -68,79 +81,127 @@ def _get_rotation_matrix(attitude: Attitude) -> np.ndarray:
     R = R_z @ R_y @ R_x
     return R
 
-def image_to_world_position(pixel: Tuple[int, int],
-                            drone_telemetry: Telemetry,
-                            intrinsics: CameraIntrinsicsHelper, # <-- FIX
-                            ground_level_z: float = 0.0) -> Position:
+@lru_cache(maxsize=8)
+def _rotation_for_attitude(roll_deg: float, pitch_deg: float, yaw_deg: float) -> np.ndarray:
     """
-    Performs geolocation (ray-casting) to find the 3D world position
-    of a pixel, assuming a flat ground plane.
+    Body-to-world rotation for an attitude in degrees, cached: every detection
+    geolocated against the same telemetry snapshot reuses one matrix instead
+    of redoing the trig and the two 3x3 products. Read-only (shared).
+    """
+    R = _get_rotation_matrix(Attitude(roll_deg, pitch_deg, yaw_deg))
+    R.flags.writeable = False
+    return R
+
+@lru_cache(maxsize=8)
+def _pixel_ray_affine(intrinsics: CameraIntrinsicsHelper,
+                      roll_deg: float, pitch_deg: float, yaw_deg: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    R_body_to_world @ K_inv for one camera and attitude, split into its
+    pixel part A (3x2) and offset b (3,), so a world ray is A @ (u, v) + b.
+    Cached like the rotation: a frame's blobs all share one snapshot.
+    """
+    M = _rotation_for_attitude(roll_deg, pitch_deg, yaw_deg) @ intrinsics.K_inv
+    A = np.ascontiguousarray(M[:, :2].T) # Transposed for row-vector pixels
+    b = M[:, 2].copy()
+    A.flags.writeable = False
+    b.flags.writeable = False
+    return A, b
+
+def image_to_world_positions(pixels: np.ndarray,
+                             drone_telemetry: Telemetry,
+                             intrinsics: CameraIntrinsicsHelper,
+                             ground_level_z: float = 0.0) -> np.ndarray:
+    """
+    Batch geolocation (ray-casting) of many pixels from one telemetry snapshot,
+    assuming a flat ground plane.
     
     Args:
-        pixel: (x, y) pixel coordinates from the image.
+        pixels: (N, 2) array-like of (x, y) pixel coordinates.
         drone_telemetry: The full Telemetry object at the time of capture.
         intrinsics: The CameraIntrinsicsHelper object for the camera used.
         ground_level_z: The Z-coordinate of the ground (e.g., 0.0 for sea level).
         
     Returns:
-        A Position object with the estimated (x, y, z) world coordinates.
+        (N, 3) float64 array of world (x, y, z). Rows whose ray cannot hit the
+        ground (parallel, or intersecting behind the camera) hold the drone's position.
     """
+    pixels = np.asarray(pixels, dtype=np.float64).reshape(-1, 2)
     
-    # 1. Pixel to Normalized Camera Coordinates
-    # Create a homogenous pixel vector: [u, v, 1]
-    pixel_vec = np.array([pixel[0], pixel[1], 1.0])
-    
-    # Un-project pixel to a 3D vector in the camera's coordinate frame
-    # v_cam = K_inv @ pixel_vec
-    # This vector (x, y, 1) points from the camera center *through* the pixel.
-    # Assumes camera X is right, Y is down, Z is forward.
-    v_cam = intrinsics.K_inv @ pixel_vec
-    
-    # 2. Get Drone Attitude
-    attitude = Attitude(
+    # 1.-4. Un-project and rotate into the world frame:
+    # v_world = R_body_to_world @ K_inv @ [u, v, 1] (camera X right, Y down, Z forward),
+    # applied as the cached affine map A, b (no homogeneous [u, v, 1] array needed)
+    # TODO: This assumes camera frame == drone body frame.
+    # In reality, you'd have another R_cam_to_body transform.
+    A, b = _pixel_ray_affine(
+        intrinsics,
         drone_telemetry.attitude_roll,
         drone_telemetry.attitude_pitch,
         drone_telemetry.attitude_yaw
     )
+    V = pixels @ A + b
     
-    # 3. Get Rotation Matrix (Drone Body to World)
-    # TODO: This assumes camera frame == drone body frame.
-    # In reality, you'd have another R_cam_to_body transform.
-    R_body_to_world = _get_rotation_matrix(attitude)
-    
-    # 4. Transform Camera Vector to World Frame
-    # v_world = R_body_to_world @ v_cam
-    v_world = R_body_to_world @ v_cam
+    # 5. Ray-Plane Intersection with the plane z = ground_level_z (normal (0, 0, 1)),
+    # so the dot products reduce to z components. Ray origin is the drone.
+    P0 = drone_telemetry.position.as_array()
+    V_dot_n = V[:, 2]
+    out = np.tile(P0, (len(V), 1)) # Fallback: drone position
     
-    # 5. Ray-Plane Intersection
-    # Ray origin (drone's current position)
-    P0 = np.array([
-        drone_telemetry.position.x,
-        drone_telemetry.position.y,
-        drone_telemetry.position.z
-    ])
-    
-    # Ray direction (the rotated vector)
-    V = v_world
+    # Rays parallel to the plane (e.g., looking at the horizon) cannot intersect
+    hits = np.abs(V_dot_n) >= 1e-6
+    t = np.zeros(len(V))
+    t[hits] = (ground_level_z - P0[2]) / V_dot_n[hits]
+    # Intersections *behind* the camera (e.g., drone below ground) are rejected too
+    hits &= t >= 0
     
-    # Plane definition (a flat plane at ground_level_z)
-    P_normal = np.array([0.0, 0.0, 1.0]) # Normal vector pointing up
-    P_origin = np.array([0.0, 0.0, ground_level_z]) # A point on the plane
+    # 6. Intersection points
+    out[hits] = P0 + t[hits, None] * V[hits]
+    return out
 
-    # Check if ray is parallel to the plane (e.g., drone looking at horizon)
-    V_dot_n = V @ P_normal
-    if abs(V_dot_n) < 1e-6:
-        # Ray is parallel or pointing away, cannot intersect
-        return drone_telemetry.position # Return drone position as fallback
-        
-    # Calculate intersection parameter 't'
-    t = ((P_origin - P0) @ P_normal) / V_dot_n
-    
+def _ground_hit(u, v, A, b, x0, y0, z0, ground_level_z):
+    """
+    Scalar ray-plane intersection for one pixel, given the cached affine map
+    (A, b) from _pixel_ray_affine; same math as image_to_world_positions.
+    No trig here: the attitude and intrinsics are already folded into A, b.
+    """
+    vx = u * A[0, 0] + v * A[1, 0] + b[0]
+    vy = u * A[0, 1] + v * A[1, 1] + b[1]
+    vz = u * A[0, 2] + v * A[1, 2] + b[2]
+    if abs(vz) < 1e-6:
+        return x0, y0, z0 # Parallel to the ground
+    t = (ground_level_z - z0) / vz
     if t < 0:
-        # Intersection is *behind* the camera (e.g., drone is below ground)
-        return drone_telemetry.position
-    
-    # 6. Calculate Intersection Point
-    P_intersect = P0 + t * V
+        return x0, y0, z0 # Intersection behind the camera
+    return x0 + t * vx, y0 + t * vy, z0 + t * vz
+
+# A compiled call instead of a dozen small-array NumPy ops for the one pixel
+# geolocated per confirmed detection
+_ground_hit_jit = njit(cache=True)(_ground_hit) if njit is not None else None
+
+def image_to_world_position(pixel: Tuple[int, int],
+                            drone_telemetry: Telemetry,
+                            intrinsics: CameraIntrinsicsHelper, # <-- FIX
+                            ground_level_z: float = 0.0) -> Position:
+    """
+    Performs geolocation (ray-casting) to find the 3D world position
+    of a pixel, assuming a flat ground plane.
+    Single-pixel form of image_to_world_positions().
     
-    return Position(x=P_intersect[0], y=P_intersect[1], z=P_intersect[2])
\ No newline at end of file
+    Returns:
+        A Position object with the estimated (x, y, z) world coordinates
+        (the drone's position if the ray cannot hit the ground).
+    """
+    if _ground_hit_jit is None:
+        return Position.from_array(
+            image_to_world_positions((pixel,), drone_telemetry, intrinsics, ground_level_z)[0]
+        )
+    A, b = _pixel_ray_affine(
+        intrinsics,
+        drone_telemetry.attitude_roll,
+        drone_telemetry.attitude_pitch,
+        drone_telemetry.attitude_yaw
+    )
+    p = drone_telemetry.position
+    return Position.from_array(_ground_hit_jit(
+        float(pixel[0]), float(pixel[1]), A, b,
+        float(p.x), float(p.y), float(p.z), float(ground_level_z)
+    ))
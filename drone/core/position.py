@@ -1,4 +1,8 @@
 """Position utilities - shared across system"""
+import math
+import numpy as np
+from dataclasses import dataclass
+from typing import Iterable
 from pydantic import BaseModel
 
 class Position(BaseModel):
@@ -7,8 +11,90 @@ class Position(BaseModel):
     y: float = 0.0
     z: float = 0.0
 
+    @classmethod
+    def from_trusted_dict(cls, d: dict) -> 'Position':
+        """
+        Build a Position without Pydantic validation.
+        Only for payloads already produced by Position.model_dump() (e.g. fleet MQTT messages).
+        """
+        return cls.model_construct(x=d["x"], y=d["y"], z=d["z"])
+
     def distance_to(self, other: 'Position') -> float:
         """Calculate Euclidean distance"""
-        return ((self.x - other.x)**2 + 
-                (self.y - other.y)**2 + 
-                (self.z - other.z)**2)**0.5
+        # One C call, no intermediate squares (and no overflow for huge values)
+        return math.hypot(self.x - other.x, self.y - other.y, self.z - other.z)
+
+
+    @classmethod
+    def from_array(cls, xyz) -> 'Position':
+        """Position from an (x, y, z) sequence, e.g. a row of an (N, 3) batch."""
+        x, y, z = xyz
+        return cls.model_construct(x=float(x), y=float(y), z=float(z))
+
+    def as_array(self) -> np.ndarray:
+        """(x, y, z) as a float64 array"""
+        return np.array((self.x, self.y, self.z))
+
+    def distances_to(self, points) -> np.ndarray:
+        """
+        Euclidean distance to each row of an (N, 3) array of x, y, z points,
+        in one vectorized pass (e.g. over a whole waypoint plan). Shape (N,),
+        float32 (computed through PositionArray, see _pairwise_sq).
+        """
+        here = PositionArray((self.x,), (self.y,), (self.z,))
+        return np.sqrt(_pairwise_sq(here, PositionArray.from_array(points))[0])
+
+
+def _pairwise_sq(a: 'PositionArray', b: 'PositionArray') -> np.ndarray:
+    """(len(a), len(b)) squared distances, one broadcast per axis."""
+    dx = a.xs[:, None] - b.xs[None, :]
+    dy = a.ys[:, None] - b.ys[None, :]
+    dz = a.zs[:, None] - b.zs[None, :]
+    return dx * dx + dy * dy + dz * dz
+
+@dataclass(slots=True)
+class PositionArray:
+    """
+    Struct-of-arrays batch of positions: contiguous float32 x, y and z columns,
+    index i across all three describing position i. For many-to-many distance
+    work (e.g. detections against targets), where a Position per pair would
+    cost a Python call each.
+    """
+    xs: np.ndarray
+    ys: np.ndarray
+    zs: np.ndarray
+
+    def __post_init__(self):
+        self.xs = np.ascontiguousarray(self.xs, dtype=np.float32)
+        self.ys = np.ascontiguousarray(self.ys, dtype=np.float32)
+        self.zs = np.ascontiguousarray(self.zs, dtype=np.float32)
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[Position]) -> 'PositionArray':
+        """Batch from Position objects"""
+        positions = list(positions)
+        return cls([p.x for p in positions], [p.y for p in positions], [p.z for p in positions])
+
+    @classmethod
+    def from_array(cls, xyz) -> 'PositionArray':
+        """Batch from an (N, 3) array of x, y, z rows"""
+        xyz = np.asarray(xyz).reshape(-1, 3)
+        return cls(xyz[:, 0], xyz[:, 1], xyz[:, 2])
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __getitem__(self, i: int) -> Position:
+        return Position.model_construct(x=float(self.xs[i]), y=float(self.ys[i]), z=float(self.zs[i]))
+
+    def as_array(self) -> np.ndarray:
+        """(N, 3) float32 array of x, y, z rows"""
+        return np.stack((self.xs, self.ys, self.zs), axis=1)
+
+    def sq_distances_to(self, other: 'PositionArray') -> np.ndarray:
+        """(len(self), len(other)) matrix of pairwise squared distances, for gating without sqrt"""
+        return _pairwise_sq(self, other)
+
+    def distances_to(self, other: 'PositionArray') -> np.ndarray:
+        """(len(self), len(other)) matrix of pairwise Euclidean distances"""
+        return np.sqrt(_pairwise_sq(self, other))
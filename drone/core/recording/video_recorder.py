@@ -2,15 +2,86 @@
 Video recording for mission documentation
 """
 import cv2
+import os
 import time
+import queue
+import threading
+from fractions import Fraction
 from pathlib import Path
 from datetime import datetime
 import numpy as np
+from typing import Optional
+
+# --- NEW: Optional PyAV for H.264 (hardware encoders where available) ---
+try:
+    import av
+except ImportError:
+    av = None
+
+# Tried in order; the first one that opens wins.
+# (codec, pixel format, encoder options)
+H264_ENCODERS = (
+    ("h264_nvenc", "nv12", {"delay": "0", "zerolatency": "1"}),      # Jetson / NVIDIA
+    ("h264_v4l2m2m", "nv12", {}),                                     # Raspberry Pi
+    ("h264_vaapi", "nv12", {}),                                       # Intel
+    ("libx264", "yuv420p", {"preset": "ultrafast", "tune": "zerolatency"}),
+)
+
+class _AvEncoder:
+    """
+    H.264 writer on top of PyAV with the same write()/release() surface
+    as cv2.VideoWriter, so VideoRecorder can use either.
+    """
+    
+    def __init__(self, path: Path, fps: int, resolution: tuple):
+        # --- FIX: Pick the codec on standalone contexts first. PyAV can't remove a
+        # stream, so a failed add_stream() would poison the container for the fallback.
+        self.codec, pix_fmt, options = self._probe_encoder(fps, resolution)
+        width, height = resolution
+        self.container = av.open(str(path), "w")
+        try:
+            self.stream = self.container.add_stream(self.codec, rate=fps)
+            self.stream.width, self.stream.height = width, height
+            self.stream.pix_fmt = pix_fmt
+            self.stream.options = options
+        except Exception:
+            self.container.close()
+            raise
+    
+    @staticmethod
+    def _probe_encoder(fps: int, resolution: tuple):
+        """First H264_ENCODERS entry whose codec context actually opens"""
+        width, height = resolution
+        for codec, pix_fmt, options in H264_ENCODERS:
+            if codec not in av.codecs_available:
+                continue
+            try:
+                ctx = av.CodecContext.create(codec, "w")
+                ctx.width, ctx.height = width, height
+                ctx.pix_fmt = pix_fmt
+                ctx.time_base = Fraction(1, fps)
+                ctx.framerate = Fraction(fps, 1)
+                ctx.options = options
+                ctx.open() # Hardware encoders fail here if the device is missing
+            except Exception as e:
+                print(f"[Recorder] {codec} unavailable ({e}), trying next encoder")
+                continue
+            return codec, pix_fmt, options
+        raise RuntimeError("no usable H.264 encoder")
+    
+    def write(self, bgr: np.ndarray):
+        frame = av.VideoFrame.from_ndarray(bgr, format="bgr24").reformat(format=self.stream.pix_fmt)
+        self.container.mux(self.stream.encode(frame))
+    
+    def release(self):
+        self.container.mux(self.stream.encode(None)) # Flush delayed packets
+        self.container.close()
 
 class VideoRecorder:
     """Records synchronized thermal + visual video"""
     
-    def __init__(self, visual_resolution: tuple, thermal_resolution: tuple, output_dir: str = "recordings"):
+    def __init__(self, visual_resolution: tuple, thermal_resolution: tuple, output_dir: str = "recordings",
+                 thermal_range: Optional[tuple] = None, writer_cpu: Optional[int] = None):
         """
         Initialize video recorder
         
@@ -18,7 +89,14 @@ class VideoRecorder:
             visual_resolution: Visual camera resolution (width, height)
             thermal_resolution: Thermal camera resolution (width, height)
             output_dir: Directory to save recordings
+            thermal_range: Fixed (min, max) temperature for the colormap; None scales per frame
+            writer_cpu: Core to pin the writer thread to (negative counts from the last core;
+                None = no pinning). Only useful if the mission process keeps off that core.
         """
+        # --- NEW: Frames are small and arrive at 10 FPS; OpenCV's internal thread pool
+        # costs more in dispatch than it gains. Process-wide, so only once recording is on.
+        cv2.setNumThreads(1)
+        
         self.visual_resolution = visual_resolution
         self.thermal_resolution = thermal_resolution
         self.output_dir = Path(output_dir)
@@ -26,58 +104,149 @@ class VideoRecorder:
         
         # Generate timestamped filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.visual_file = self.output_dir / f"visual_{timestamp}.avi"
-        self.thermal_file = self.output_dir / f"thermal_{timestamp}.avi"
-        
-        # Video writers
-        fourcc = cv2.VideoWriter_fourcc(*'XVID')
-        self.visual_writer = cv2.VideoWriter(
-            str(self.visual_file),
-            fourcc,
-            10.0,  # FPS
-            visual_resolution
-        )
-        self.thermal_writer = cv2.VideoWriter(
-            str(self.thermal_file),
-            fourcc,
-            10.0,
-            thermal_resolution
-        )
+        self.visual_writer, self.visual_file = self._open_writer("visual", timestamp, visual_resolution)
+        self.thermal_writer, self.thermal_file = self._open_writer("thermal", timestamp, thermal_resolution)
         
         self.recording = False
-        self.frame_count = 0
+        self.frame_count = 0 # Written by the writer thread only
+        self.dropped_frames = 0
+        
+        # --- NEW: JET colormap as a (256, 3) BGR lookup table, built once ---
+        self._jet_lut = cv2.applyColorMap(
+            np.arange(256, dtype=np.uint8).reshape(-1, 1), cv2.COLORMAP_JET
+        ).reshape(256, 3)
+        
+        # --- NEW: Fixed thermal scale: uint8 = alpha * T + beta, no per-frame min/max ---
+        self._fixed_scale = None
+        if thermal_range is not None:
+            vmin, vmax = thermal_range
+            alpha = 255.0 / max(vmax - vmin, 1e-6)
+            self._fixed_scale = (alpha, -vmin * alpha)
+        
+        # --- NEW: Persistent per-frame buffers (writer thread only) ---
+        # Output-sized ones are allocated here; the native-thermal-sized ones on
+        # the first frame, since the sensor shape isn't known until then.
+        self._therm_bgr = np.empty((thermal_resolution[1], thermal_resolution[0], 3), np.uint8)
+        self._vis_bgr = np.empty((visual_resolution[1], visual_resolution[0], 3), np.uint8)
+        self._therm_u8 = None
+        self._therm_colored = None
+        self._needs_thermal_resize = True # Settled on the first frame
+        
+        # --- NEW: Encoding runs on a writer thread ---
+        # write_frame() only enqueues; the small bound keeps memory at a couple
+        # of frame pairs and the oldest pair is dropped if the encoder falls behind.
+        self._q: queue.Queue = queue.Queue(maxsize=2)
+        self._writer_cpu = writer_cpu
+        self._writer = threading.Thread(target=self._writer_loop, name="VideoRecorder", daemon=True)
+        self._writer.start()
         
         print(f"[Recorder] Initialized")
         print(f"  Visual: {self.visual_file}")
         print(f"  Thermal: {self.thermal_file}")
     
+    def _open_writer(self, name: str, timestamp: str, resolution: tuple):
+        """H.264 .mp4 through PyAV when possible, otherwise XVID .avi through OpenCV"""
+        if av is not None:
+            path = self.output_dir / f"{name}_{timestamp}.mp4"
+            try:
+                writer = _AvEncoder(path, 10, resolution)
+                print(f"[Recorder] {name}: {writer.codec}")
+                return writer, path
+            except Exception as e:
+                print(f"[Recorder] PyAV unavailable for {name} ({e}), falling back to XVID")
+        
+        path = self.output_dir / f"{name}_{timestamp}.avi"
+        fourcc = cv2.VideoWriter_fourcc(*'XVID')
+        writer = cv2.VideoWriter(
+            str(path),
+            fourcc,
+            10.0,  # FPS
+            resolution
+        )
+        return writer, path
+    
     def start(self):
         """Start recording"""
         self.recording = True
         print("[Recorder] Recording started")
     
     def write_frame(self, thermal_frame, visual_frame):
-        """Write synchronized frame pair"""
+        """Queue a synchronized frame pair for writing (never blocks)"""
         if not self.recording:
             return
         
-        # Convert thermal to colormap for visualization
-        thermal_normalized = cv2.normalize(
-            thermal_frame.temperature_array,
-            None,
-            0,
-            255,
-            cv2.NORM_MINMAX,
-            dtype=cv2.CV_8U
-        )
-        thermal_colored = cv2.applyColorMap(thermal_normalized, cv2.COLORMAP_JET)
+        item = (thermal_frame, visual_frame)
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            # Drop the oldest pair so the newest always gets recorded
+            try:
+                self._q.get_nowait()
+                self.dropped_frames += 1
+            except queue.Empty:
+                pass
+            try:
+                self._q.put_nowait(item)
+            except queue.Full:
+                self.dropped_frames += 1
+    
+    def _writer_loop(self):
+        """Writer thread: convert and encode queued pairs until the None sentinel"""
+        self._pin_writer_thread()
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            try:
+                self._write_pair(*item)
+            except Exception as e:
+                print(f"[Recorder] Error writing frame: {e}")
+    
+    def _pin_writer_thread(self):
+        """Pin the calling (writer) thread to its own core, where supported (Linux)"""
+        if self._writer_cpu is None or not hasattr(os, "sched_setaffinity"):
+            return
+        try:
+            cpus = sorted(os.sched_getaffinity(0))
+            cpu = cpus[self._writer_cpu] if self._writer_cpu < 0 else self._writer_cpu
+            if len(cpus) > 1 and cpu in cpus:
+                os.sched_setaffinity(0, {cpu}) # pid 0 = this thread
+        except (OSError, IndexError) as e:
+            print(f"[Recorder] Could not pin writer thread: {e}")
+    
+    def _write_pair(self, thermal_frame, visual_frame):
+        """Convert and encode one frame pair (writer thread)"""
+        # Convert thermal to colormap for visualization:
+        # min/max stretch to uint8 in one pass, then a single LUT gather to BGR
+        temps = thermal_frame.temperature_array
+        if self._therm_u8 is None or self._therm_u8.shape != temps.shape:
+            self._therm_u8 = np.empty(temps.shape, np.uint8)
+            self._therm_colored = np.empty((*temps.shape, 3), np.uint8)
+            width, height = self.thermal_resolution
+            self._needs_thermal_resize = temps.shape != (height, width)
+        if self._fixed_scale is not None:
+            # Saturating convert: below vmin -> 0, above vmax -> 255
+            alpha, beta = self._fixed_scale
+            cv2.addWeighted(temps, alpha, temps, 0.0, beta, dst=self._therm_u8, dtype=cv2.CV_8U)
+        else:
+            lo, hi, _, _ = cv2.minMaxLoc(temps)
+            scale = 255.0 / max(hi - lo, 1e-6)
+            cv2.convertScaleAbs(temps, self._therm_u8, alpha=scale, beta=-lo * scale)
+        np.take(self._jet_lut, self._therm_u8, axis=0, out=self._therm_colored)
         
         # Resize thermal to match aspect ratio if needed
-        thermal_resized = cv2.resize(thermal_colored, self.thermal_resolution)
+        if self._needs_thermal_resize:
+            cv2.resize(self._therm_colored, self.thermal_resolution, dst=self._therm_bgr)
+            thermal_out = self._therm_bgr
+        else:
+            thermal_out = self._therm_colored # Already at the recording resolution
         
-        # Write frames
-        self.thermal_writer.write(thermal_resized)
-        self.visual_writer.write(cv2.cvtColor(visual_frame.image, cv2.COLOR_RGB2BGR))
+        # Write frames (the encoder is done with the buffers once write() returns)
+        self.thermal_writer.write(thermal_out)
+        if visual_frame.pixel_order == 'bgr':
+            self.visual_writer.write(visual_frame.image) # Already in the encoder's order
+        else:
+            self.visual_writer.write(cv2.cvtColor(visual_frame.image, cv2.COLOR_RGB2BGR, dst=self._vis_bgr))
         
         self.frame_count += 1
     
@@ -87,9 +256,12 @@ class VideoRecorder:
             return
         
         self.recording = False
+        # Let the writer thread drain what's queued, then close the files
+        self._q.put(None)
+        self._writer.join()
         self.visual_writer.release()
         self.thermal_writer.release()
         
-        print(f"[Recorder] Recording stopped - {self.frame_count} frames saved")
+        print(f"[Recorder] Recording stopped - {self.frame_count} frames saved, {self.dropped_frames} dropped")
         print(f"  Visual: {self.visual_file}")
         print(f"  Thermal: {self.thermal_file}")
\ No newline at end of file
@@ -1,6 +1,6 @@
 """
 Safety layer for collision avoidance.
-Implements the Decorator pattern by wrapping a BaseFlightController.
+Implements the Decorator pattern by wrapping any BaseFlightController.
 """
 import asyncio
 from .drone import BaseFlightController, Telemetry
@@ -42,7 +42,7 @@ class StubObstacleSensor:
         ]
         return safe_path
 
-class CollisionAvoider(BaseFlightController):
+class CollisionAvoider: # Satisfies the BaseFlightController protocol
     """
     Decorator for a flight controller that adds a collision avoidance layer.
     It intercepts 'go_to' commands and checks them for safety.
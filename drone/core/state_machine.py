@@ -1,5 +1,5 @@
 """
-Formal mission state machine using the 'transitions' library.
+Formal mission state machine (hand-rolled transition table).
 (Refactored for COBALT P2P Roles)
 
 This file is based on the original `state_machine.py` from the `drone-mob` repository
@@ -7,8 +7,11 @@ This file is based on the original `state_machine.py` from the `drone-mob` repos
 and has been significantly modified to implement the P2P roles
 described in the "Cobalt drone" document.
 """
+import asyncio
+import contextvars
+import inspect
+import orjson
 from enum import Enum
-from transitions.extensions.asyncio import AsyncMachine
 from .comms import MqttClient
 
 class MissionPhase(Enum):
@@ -46,105 +49,168 @@ class MissionPhase(Enum):
     # OVERWATCH = "OVERWATCH"
 
 
+# --- NEW: Transition conditions as bit flags ---
+# A transition's conditions are OR-ed into one mask; it is eligible when
+# (mask & current_flags) == mask. 0 means unconditional.
+SCOUT = 1 << 0
+PAYLOAD = 1 << 1
+UTILITY = 1 << 2
+MOB_SEARCH = 1 << 3
+STANDBY_MISSION = 1 << 4
+PATROL_MISSION = 1 << 5
+OVERWATCH_MISSION = 1 << 6
+DELIVERY_MISSION = 1 << 7
+
+ROLE_FLAGS = {'scout': SCOUT, 'payload': PAYLOAD, 'utility': UTILITY}
+MISSION_FLAGS = {
+    'MOB_SEARCH': MOB_SEARCH,
+    'STANDBY': STANDBY_MISSION,
+    'PATROL': PATROL_MISSION,
+    'OVERWATCH': OVERWATCH_MISSION,
+    'PAYLOAD_DELIVERY': DELIVERY_MISSION,
+}
+
+ALL_PHASES = tuple(MissionPhase)
+
+# The trigger task that owns the current transition chain. Triggers fired from
+# inside a callback (same task) run nested instead of registering again.
+_current_trigger = contextvars.ContextVar('current_trigger', default=None)
+
+MAX_PENDING_STATE_PUBS = 32 # Oldest state publish is cancelled beyond this
+
+# Cancel message for triggers superseded by a newer transition. Only these
+# cancellations are absorbed by fire(); any other (task/TaskGroup teardown,
+# Ctrl-C) propagates, as transitions.AsyncMachine does with CANCELLED_MSG.
+_SUPERSEDED = "superseded by a later transition"
+
+
+class InvalidTriggerError(Exception):
+    """A trigger was fired from a state that has no transition for it."""
+
+
+def _trigger_method(trigger: str):
+    """Model method that fires `trigger` on the model's own state machine."""
+    async def fire_trigger(model, *args, **kwargs) -> bool:
+        return await model.state_machine.fire(trigger, *args, **kwargs)
+    fire_trigger.__name__ = fire_trigger.__qualname__ = trigger
+    return fire_trigger
+
+
 class MissionStateMachine:
     """
     Manages state transitions for a single drone in the P2P swarm.
+    
+    Transitions live in a dict keyed by (state, trigger); each entry is the
+    ordered list of (condition mask, destination, after-callback, is_async)
+    candidates, and the first eligible candidate wins. Trigger methods
+    (start_mission, takeoff_success, ...) are defined on the model's class,
+    dispatch through the model's `state_machine` attribute, and must be
+    awaited. As with transitions.AsyncMachine, a transition that
+    fires cancels any other trigger still running for the model.
     """
     
     def __init__(self, model, mqtt_client: MqttClient):
         self.model = model
         self.mqtt = mqtt_client
         
-        states = [e for e in MissionPhase]
-
-        self.machine = AsyncMachine(
-            model=model, 
-            states=states, 
-            initial=MissionPhase.IDLE,
-            after_state_change='_on_state_change'
-        )
+        self._table: dict = {}
+        # A drone's role is fixed for its lifetime, so its flag is resolved once.
+        # Only the mission type is read per trigger.
+        self._role_flag = ROLE_FLAGS.get(model.role, 0)
+        self._running: list = [] # Trigger tasks currently in progress
+        # In-flight state publishes; a dict so iteration order is oldest-first
+        self._pending_pubs: dict = {}
+        
+        model.state = MissionPhase.IDLE
+        
+        # --- NEW: fleet/state payloads encoded once per phase (id and role are fixed) ---
+        self._state_topic = f"fleet/state/{model.drone.id}"
+        self._state_msgs = {
+            phase: orjson.dumps({"state": phase.name, "drone_id": model.drone.id, "role": model.role})
+            for phase in MissionPhase
+        }
         
         # --- Simplified Triggers (callbacks in MissionController handle role logic) ---
         
         # --- Standard Mission Start ---
         # These triggers are called by the _p2p_event_listener
-        self.machine.add_transition('start_mission', [MissionPhase.IDLE, MissionPhase.ROLE_UTILITY_TASK], MissionPhase.PREFLIGHT, after='_run_preflight')
-        self.machine.add_transition('start_standby_mission', [MissionPhase.IDLE, MissionPhase.ROLE_UTILITY_TASK], MissionPhase.PREFLIGHT, after='_run_preflight')
-        self.machine.add_transition('start_patrol_mission', MissionPhase.IDLE, MissionPhase.PREFLIGHT, after='_run_preflight')
-        self.machine.add_transition('start_overwatch_mission', [MissionPhase.IDLE, MissionPhase.ROLE_UTILITY_TASK], MissionPhase.PREFLIGHT, after='_run_preflight')
+        self.add_transition('start_mission', [MissionPhase.IDLE, MissionPhase.ROLE_UTILITY_TASK], MissionPhase.PREFLIGHT, after='_run_preflight')
+        self.add_transition('start_standby_mission', [MissionPhase.IDLE, MissionPhase.ROLE_UTILITY_TASK], MissionPhase.PREFLIGHT, after='_run_preflight')
+        self.add_transition('start_patrol_mission', MissionPhase.IDLE, MissionPhase.PREFLIGHT, after='_run_preflight')
+        self.add_transition('start_overwatch_mission', [MissionPhase.IDLE, MissionPhase.ROLE_UTILITY_TASK], MissionPhase.PREFLIGHT, after='_run_preflight')
 
-        self.machine.add_transition('preflight_success', MissionPhase.PREFLIGHT, MissionPhase.TAKEOFF, after='_run_takeoff')
+        self.add_transition('preflight_success', MissionPhase.PREFLIGHT, MissionPhase.TAKEOFF, after='_run_takeoff')
         
         # --- Post-Takeoff Role Assumption ---
         # The callback in MissionController (_run_takeoff) determines the *correct* altitude
         # based on self.current_mission_type.
-        self.machine.add_transition(
+        self.add_transition(
             'takeoff_success', 
             MissionPhase.TAKEOFF, 
             MissionPhase.ROLE_SEARCH_PRIMARY, 
             after='_run_search_step', 
-            conditions=['_is_mob_search', '_is_scout'] # Custom conditions
+            conditions=MOB_SEARCH | SCOUT
         )
-        self.machine.add_transition(
+        self.add_transition(
             'takeoff_success', 
             MissionPhase.TAKEOFF, 
             MissionPhase.ROLE_SEARCH_ASSIST, 
             after='_run_search_step', 
-            conditions=['_is_mob_search', '_is_utility']
+            conditions=MOB_SEARCH | UTILITY
         )
-        self.machine.add_transition(
+        self.add_transition(
             'takeoff_success', 
             MissionPhase.TAKEOFF, 
             MissionPhase.ROLE_EMERGENCY_STANDBY, 
             after='_run_standby', 
-            conditions=['_is_standby_mission']
+            conditions=STANDBY_MISSION
         )
-        self.machine.add_transition(
+        self.add_transition(
             'takeoff_success', 
             MissionPhase.TAKEOFF, 
             MissionPhase.ROLE_UTILITY_TASK, 
             after='_run_patrol', 
-            conditions=['_is_patrol_mission']
+            conditions=PATROL_MISSION
         )
-        self.machine.add_transition(
+        self.add_transition(
             'takeoff_success', 
             MissionPhase.TAKEOFF, 
-            MissionPhase.ROLE_EMERGency_EYES, 
+            MissionPhase.ROLE_EMERGENCY_EYES, 
             after='_run_overwatch', 
-            conditions=['_is_overwatch_mission']
+            conditions=OVERWATCH_MISSION
         )
         # Handle Gen-Emerg assist role
-        self.machine.add_transition(
+        self.add_transition(
             'takeoff_success', 
             MissionPhase.TAKEOFF, 
             MissionPhase.ROLE_EMERGENCY_ASSIST, 
             after='_run_overwatch', # Assist role also does overwatch
-            conditions=['_is_overwatch_mission', '_is_utility']
+            conditions=OVERWATCH_MISSION | UTILITY
         )
 
 
         # --- Target Sighting Logic ---
-        self.machine.add_transition(
+        self.add_transition(
             'target_sighted', 
             [MissionPhase.ROLE_SEARCH_PRIMARY, MissionPhase.ROLE_SEARCH_ASSIST], 
             MissionPhase.TARGET_PENDING_CONFIRMATION,
             after='_request_operator_confirmation'
         )
-        self.machine.add_transition(
+        self.add_transition(
             'reject_target', 
             MissionPhase.TARGET_PENDING_CONFIRMATION, 
             MissionPhase.ROLE_SEARCH_PRIMARY, # Go back to searching
             after='_handle_rejection',
-            conditions=['_is_scout']
+            conditions=SCOUT
         )
-        self.machine.add_transition(
+        self.add_transition(
             'reject_target', 
             MissionPhase.TARGET_PENDING_CONFIRMATION, 
             MissionPhase.ROLE_SEARCH_ASSIST, # Go back to searching
             after='_handle_rejection',
-            conditions=['_is_utility']
+            conditions=UTILITY
         )
-        self.machine.add_transition(
+        self.add_transition(
             'confirm_target', 
             MissionPhase.TARGET_PENDING_CONFIRMATION, 
             MissionPhase.TARGET_CONFIRMED,
@@ -152,57 +218,144 @@ class MissionStateMachine:
         )
         
         # --- Payload Drone Logic ---
-        self.machine.add_transition(
+        self.add_transition(
             'start_delivery_mission',
             [MissionPhase.IDLE, MissionPhase.ROLE_EMERGENCY_STANDBY],
             MissionPhase.PREFLIGHT, # Always preflight before delivery
             after='_run_preflight'
         )
-        self.machine.add_transition(
+        self.add_transition(
             'takeoff_success',
             MissionPhase.TAKEOFF,
             MissionPhase.DELIVERING,
             after='_run_payload_delivery',
-            conditions=['_is_delivery_mission']
+            conditions=DELIVERY_MISSION
         )
 
         # --- Common End-of-Mission Paths ---
-        self.machine.add_transition('search_complete_negative', [MissionPhase.ROLE_SEARCH_PRIMARY, MissionPhase.ROLE_SEARCH_ASSIST], MissionPhase.RETURNING, after='_run_return_to_home')
-        self.machine.add_transition('delivery_request_sent', MissionPhase.TARGET_CONFIRMED, MissionPhase.RETURNING, after='_run_return_to_home')
-        self.machine.add_transition('delivery_complete', MissionPhase.DELIVERING, MissionPhase.RETURNING, after='_run_return_to_home')
-        self.machine.add_transition('patrol_complete', MissionPhase.ROLE_UTILITY_TASK, MissionPhase.RETURNING, after='_run_return_to_home')
-        self.machine.add_transition('patrol_battery_low', MissionPhase.ROLE_UTILITY_TASK, MissionPhase.RETURNING, after='_run_return_to_home')
-        self.machine.add_transition('overwatch_complete', [MissionPhase.ROLE_EMERGENCY_EYES, MissionPhase.ROLE_EMERGENCY_ASSIST], MissionPhase.RETURNING, after='_run_return_to_home')
+        self.add_transition('search_complete_negative', [MissionPhase.ROLE_SEARCH_PRIMARY, MissionPhase.ROLE_SEARCH_ASSIST], MissionPhase.RETURNING, after='_run_return_to_home')
+        self.add_transition('delivery_request_sent', MissionPhase.TARGET_CONFIRMED, MissionPhase.RETURNING, after='_run_return_to_home')
+        self.add_transition('delivery_complete', MissionPhase.DELIVERING, MissionPhase.RETURNING, after='_run_return_to_home')
+        self.add_transition('patrol_complete', MissionPhase.ROLE_UTILITY_TASK, MissionPhase.RETURNING, after='_run_return_to_home')
+        self.add_transition('patrol_battery_low', MissionPhase.ROLE_UTILITY_TASK, MissionPhase.RETURNING, after='_run_return_to_home')
+        self.add_transition('overwatch_complete', [MissionPhase.ROLE_EMERGENCY_EYES, MissionPhase.ROLE_EMERGENCY_ASSIST], MissionPhase.RETURNING, after='_run_return_to_home')
         
-        self.machine.add_transition('arrived_home', MissionPhase.RETURNING, MissionPhase.LANDING, after='_run_land')
-        self.machine.add_transition('land_complete', MissionPhase.LANDING, MissionPhase.COMPLETED, after='_log_mission_summary')
+        self.add_transition('arrived_home', MissionPhase.RETURNING, MissionPhase.LANDING, after='_run_land')
+        self.add_transition('land_complete', MissionPhase.LANDING, MissionPhase.COMPLETED, after='_log_mission_summary')
 
         # --- Emergency & Operator Takeover ---
-        self.machine.add_transition('trigger_emergency', '*', MissionPhase.EMERGENCY, after='_run_emergency_land')
-        self.machine.add_transition('local_operator_takeover', '*', MissionPhase.LOCAL_OPERATOR_CONTROL, after='_run_local_operator_takeover')
-        self.machine.add_transition('local_operator_release', MissionPhase.LOCAL_OPERATOR_CONTROL, MissionPhase.RETURNING, after='_run_local_operator_release')
+        self.add_transition('trigger_emergency', '*', MissionPhase.EMERGENCY, after='_run_emergency_land')
+        self.add_transition('local_operator_takeover', '*', MissionPhase.LOCAL_OPERATOR_CONTROL, after='_run_local_operator_takeover')
+        self.add_transition('local_operator_release', MissionPhase.LOCAL_OPERATOR_CONTROL, MissionPhase.RETURNING, after='_run_local_operator_release')
         
         # --- Final cleanup ---
-        self.machine.add_transition('mission_finished', MissionPhase.COMPLETED, MissionPhase.IDLE)
-        self.machine.add_transition('reset_from_emergency', MissionPhase.EMERGENCY, MissionPhase.IDLE)
+        self.add_transition('mission_finished', MissionPhase.COMPLETED, MissionPhase.IDLE)
+        self.add_transition('reset_from_emergency', MissionPhase.EMERGENCY, MissionPhase.IDLE)
+
+    def add_transition(self, trigger: str, source, dest: MissionPhase,
+                       after: str = None, conditions: int = 0):
+        """
+        Register a transition. `source` is a phase, a list of phases or '*'.
+        `after` names a model method run once the state has changed;
+        `conditions` is a mask of the flags above (all must hold).
+        """
+        if source == '*':
+            sources = ALL_PHASES
+        elif isinstance(source, MissionPhase):
+            sources = (source,)
+        else:
+            sources = source
+        # Bind the callback (and whether it must be awaited) once, not per fire
+        callback = getattr(self.model, after) if after is not None else None
+        is_async = inspect.iscoroutinefunction(callback)
+        entry = (conditions, dest, callback, is_async)
+        for phase in sources:
+            self._table.setdefault((phase, trigger), []).append(entry)
+        
+        # On the class, not the instance, so slotted models (no __dict__) work
+        model_cls = type(self.model)
+        if not hasattr(model_cls, trigger):
+            setattr(model_cls, trigger, _trigger_method(trigger))
 
+    def _current_flags(self) -> int:
+        """Condition flags for this trigger (evaluated once, then masked per candidate)."""
+        return self._role_flag | MISSION_FLAGS.get(self.model.current_mission_type, 0)
 
-    async def _on_state_change(self, event):
+    async def fire(self, trigger: str, *args, **kwargs) -> bool:
+        """
+        Fire `trigger` on the model. Returns True if a transition happened,
+        False if no candidate's conditions held (or this trigger was superseded
+        by a later transition). Arguments are passed through to the after-callback.
+        Cancellation from anywhere else is re-raised.
+        """
+        if _current_trigger.get() is not None:
+            # Fired from a callback of a running trigger: part of its chain
+            return await self._process(trigger, args, kwargs)
+        
+        task = asyncio.current_task()
+        token = _current_trigger.set(task)
+        self._running.append(task)
+        try:
+            return await self._process(trigger, args, kwargs)
+        except asyncio.CancelledError as e:
+            if not (e.args and e.args[0] == _SUPERSEDED):
+                raise
+            # Absorb only our own cancel, unless another one is also pending
+            if task.uncancel() > 0:
+                raise
+            return False
+        finally:
+            self._running.remove(task)
+            _current_trigger.reset(token)
+
+    async def _process(self, trigger: str, args, kwargs) -> bool:
+        model = self.model
+        candidates = self._table.get((model.state, trigger))
+        if candidates is None:
+            raise InvalidTriggerError(f"Can't trigger event {trigger} from state {model.state.name}!")
+        
+        flags = self._current_flags()
+        for mask, dest, callback, is_async in candidates:
+            if mask & flags != mask:
+                continue
+            self._cancel_running()
+            model.state = dest
+            self._on_phase_entered()
+            if is_async:
+                await callback(*args, **kwargs)
+            elif callback is not None:
+                callback(*args, **kwargs)
+            await self._on_state_change(dest)
+            return True
+        return False
+
+    def _cancel_running(self):
+        """The transition is happening: cancel other in-flight triggers for this model."""
+        current = _current_trigger.get()
+        for task in self._running:
+            if task is not current and not task.done():
+                task.cancel(msg=_SUPERSEDED)
+
+    def _on_phase_entered(self):
+        """Refresh the model's cached phase string and wake its event-driven waits."""
+        self.model._phase_str = self.model.state.value
+        self.model._phase_changed_evt.set()
+
+    async def _on_state_change(self, new_state: MissionPhase):
         """Log all state changes and publish them to MQTT for the Hub/GCS."""
-        new_state = str(event.state.name)
-        self.model.logger.log(f"State changed to: {new_state}", "info")
-        await self.mqtt.publish(
-            f"fleet/state/{self.model.drone.id}",
-            {"state": new_state, "drone_id": self.model.drone.id, "role": self.model.role}
+        state_name = new_state.name
+        self.model.logger.log(f"State changed to: {state_name}", "info")
+        # Fire-and-forget: broker backpressure must not hold up the transition
+        task = asyncio.create_task(
+            self.mqtt.publish_raw(self._state_topic, self._state_msgs[new_state])
         )
-    
-    # --- Helper methods for conditions ---
-    def _is_scout(self): return self.model.role == 'scout'
-    def _is_payload(self): return self.model.role == 'payload'
-    def _is_utility(self): return self.model.role == 'utility'
-    
-    def _is_mob_search(self): return self.model.current_mission_type == 'MOB_SEARCH'
-    def _is_standby_mission(self): return self.model.current_mission_type == 'STANDBY'
-    def _is_patrol_mission(self): return self.model.current_mission_type == 'PATROL'
-    def _is_overwatch_mission(self): return self.model.current_mission_type == 'OVERWATCH'
-    def _is_delivery_mission(self): return self.model.current_mission_type == 'PAYLOAD_DELIVERY'
\ No newline at end of file
+        pending = self._pending_pubs
+        pending[task] = None
+        task.add_done_callback(self._discard_pub)
+        if len(pending) > MAX_PENDING_STATE_PUBS:
+            oldest = next(iter(pending)) # Drop the oldest
+            del pending[oldest]
+            oldest.cancel()
+
+    def _discard_pub(self, task: asyncio.Task):
+        self._pending_pubs.pop(task, None)
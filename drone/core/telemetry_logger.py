@@ -1,94 +1,134 @@
 """
 Telemetry Logger for writing machine-readable logs (CSV).
 """
-import csv
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import List
+from typing import Sequence
 from .drone import Drone, Telemetry  # <--- CORRECTED: Added 'Drone' import
-from .cameras.base import Detection
+from .cameras.base import Detection, best_detection
+
+# --- NEW: Rows are buffered and flushed in batches, not one syscall per row ---
+FLUSH_EVERY_ROWS = 64
+FLUSH_EVERY_S = 1.0
 
 class TelemetryLogger:
-    """Logs drone state and detections to a CSV file."""
+    """
+    Logs drone state and detections to CSV files.
+    
+    State goes to telemetry_base_*.csv on every snapshot; the best detection
+    goes to telemetry_detections_*.csv only when there is one. Rows in both
+    carry (timestamp_us, drone_id) so they can be joined offline.
+    
+    timestamp_us is time.monotonic_ns() // 1000 (an integer, immune to clock
+    steps). Each file starts with a '#' comment line anchoring it to wall-clock
+    time: wall = wall_anchor + (timestamp_us - monotonic_anchor_us) / 1e6.
+    """
     
     def __init__(self, log_dir: str = "logs/telemetry"):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
+        # Wall-clock anchor for the monotonic timestamps
+        self._anchor_us = time.monotonic_ns() // 1000
+        self._anchor_wall = time.time()
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file_path = self.log_dir / f"telemetry_{timestamp}.csv"
+        self.log_file_path = self.log_dir / f"telemetry_base_{timestamp}.csv"
+        self.det_file_path = self.log_dir / f"telemetry_detections_{timestamp}.csv"
         
-        self.file_handle = open(self.log_file_path, 'w', newline='')
-        self.writer = None
+        self.file_handle = open(self.log_file_path, 'w', newline='', buffering=65536)
+        self.det_file_handle = open(self.det_file_path, 'w', newline='', buffering=65536)
+        self._unflushed_rows = 0
+        self._last_flush = time.monotonic()
         self._write_header()
         
         print(f"[TelemetryLogger] Logging machine-readable data to: {self.log_file_path}")
+        print(f"[TelemetryLogger] Detections: {self.det_file_path}")
 
     def _write_header(self):
-        """Writes the CSV header row."""
-        self.header = [
-            'timestamp',
-            'mission_state',
-            'drone_id',
-            'pos_x', 'pos_y', 'pos_z',
-            'battery',
-            'drone_state',
-            'detection_count',
-            'best_det_source',
-            'best_det_confidence',
-            'best_det_img_x',
-            'best_det_img_y',
-            'best_det_track_id'
+        """Writes both CSV header rows and builds the row templates."""
+        # (column, format spec). Every value is numeric or a short identifier,
+        # so rows are produced with str.format instead of csv quoting.
+        base_columns = [
+            ('timestamp_us', ''),
+            ('mission_state', ''),
+            ('drone_id', ''),
+            ('pos_x', ':.2f'), ('pos_y', ':.2f'), ('pos_z', ':.2f'),
+            ('battery', ':.2f'),
+            ('drone_state', ''),
+            ('detection_count', '')
         ]
-        self.writer = csv.DictWriter(self.file_handle, fieldnames=self.header)
-        self.writer.writeheader()
-        self.file_handle.flush()
+        det_columns = [
+            ('timestamp_us', ''),
+            ('drone_id', ''),
+            ('best_det_source', ''),
+            ('best_det_confidence', ':.2f'),
+            ('best_det_img_x', ''),
+            ('best_det_img_y', ''),
+            ('best_det_track_id', '')
+        ]
+        self.header = [name for name, _ in base_columns]
+        self.det_header = [name for name, _ in det_columns]
+        self._row_fmt = ",".join("{" + spec + "}" for _, spec in base_columns) + "\n"
+        self._det_row_fmt = ",".join("{" + spec + "}" for _, spec in det_columns) + "\n"
+        
+        anchor = f"# monotonic_anchor_us={self._anchor_us},wall_anchor={self._anchor_wall:.6f}\n"
+        self.file_handle.write(anchor + ",".join(self.header) + "\n")
+        self.det_file_handle.write(anchor + ",".join(self.det_header) + "\n")
+        self._flush()
 
     async def log_snapshot(self, 
                            mission_state: str,
                            drone: 'Drone', # This type hint now resolves correctly
-                           detections: List[Detection]):
+                           detections: Sequence[Detection]):
         """
-        Asynchronously writes a single snapshot of system state to the CSV.
+        Asynchronously writes a single snapshot of system state to the CSVs.
         
         Args:
             mission_state: The current MissionPhase (as a string).
             drone: The Drone object.
-            detections: List of current confirmed detections from the tracker.
+            detections: Current confirmed detections from the tracker (any sequence).
         """
-        timestamp = time.time()
+        timestamp = time.monotonic_ns() // 1000
         telemetry = drone.telemetry # Get latest telemetry
+        pos = telemetry.position
         
-        best_det = None
+        self.file_handle.write(self._row_fmt.format(
+            timestamp, mission_state, drone.id,
+            pos.x, pos.y, pos.z, telemetry.battery, telemetry.state,
+            len(detections)
+        ))
         if detections:
             # Find the detection with the highest confidence
-            best_det = max(detections, key=lambda d: d.confidence)
-
-        row = {
-            'timestamp': f"{timestamp:.3f}",
-            'mission_state': mission_state,
-            'drone_id': drone.id,
-            'pos_x': f"{telemetry.position.x:.2f}",
-            'pos_y': f"{telemetry.position.y:.2f}",
-            'pos_z': f"{telemetry.position.z:.2f}",
-            'battery': f"{telemetry.battery:.2f}",
-            'drone_state': telemetry.state,
-            'detection_count': len(detections),
-            'best_det_source': best_det.source if best_det else 'N/A',
-            'best_det_confidence': f"{best_det.confidence:.2f}" if best_det else 0.0,
-            'best_det_img_x': best_det.position_image[0] if best_det else 0,
-            'best_det_img_y': best_det.position_image[1] if best_det else 0,
-            'best_det_track_id': best_det.metadata.get('track_id', 'N/A') if best_det else 'N/A'
-        }
+            best_det = best_detection(detections)
+            self.det_file_handle.write(self._det_row_fmt.format(
+                timestamp, drone.id,
+                best_det.source,
+                best_det.confidence,
+                best_det.position_image[0],
+                best_det.position_image[1],
+                best_det.metadata.get('track_id', 'N/A')
+            ))
         
-        # Write and flush to ensure data is saved
-        self.writer.writerow(row)
-        self.file_handle.flush()
+        # Rows collect in the file buffers; flushed every FLUSH_EVERY_ROWS rows
+        # or FLUSH_EVERY_S seconds, whichever comes first
+        self._unflushed_rows += 1
+        now = time.monotonic()
+        if self._unflushed_rows >= FLUSH_EVERY_ROWS or now - self._last_flush >= FLUSH_EVERY_S:
+            self._flush()
+            self._last_flush = now
         
+    def _flush(self):
+        self.file_handle.flush()
+        self.det_file_handle.flush()
+        self._unflushed_rows = 0
+
     def close(self):
-        """Closes the log file handle."""
+        """Closes the log file handles (flushing any buffered rows)."""
         if self.file_handle:
             self.file_handle.close()
+            self.det_file_handle.close()
             self.file_handle = None
-            print("[TelemetryLogger] Log file closed.")
\ No newline at end of file
+            self.det_file_handle = None
+            print("[TelemetryLogger] Log files closed.")
@@ -10,7 +10,7 @@ Usage:
     python main.py --id utility_1
 """
 
-import yaml
+import logging
 import sys
 import asyncio 
 import traceback
@@ -26,15 +26,16 @@ if str(CORE_DIR) not in sys.path:
 # --- End Import Logic ---
 
 # Import all core components
+# --- CHANGED: Camera backends are imported inside the branch that selects
+# them, so a run only pays for the one it uses.
 from core.drone import Drone, SimulatedFlightController, MavlinkController
 from core.cameras.dual_camera import DualCameraSystem
-from core.cameras.thermal.simulated import SimulatedThermalCamera
-from core.cameras.visual.simulated import SimulatedVisualCamera
 from core.logger import MissionLogger
 from core.mission import MissionController
-from core.config_models import Settings, DroneConfig
+from core.config_models import Settings, DroneConfig, load_settings_cached
 from core.safety import CollisionAvoider, StubObstacleSensor
 from core.comms import MqttClient
+from core.event_loop import install_fast_loop
 
 # Import all strategies to pass to the controller
 from strategies.search.lawnmower import create_lawnmower_search_strategy
@@ -49,10 +50,8 @@ def load_config(config_path: str = "config/mission_config.yaml") -> Settings:
     """Load and validate configuration."""
     config_file = Path(__file__).parent / config_path
     try:
-        with open(config_file, 'r') as f:
-            config_data = yaml.safe_load(f)
-        settings = Settings(**config_data)
-        return settings
+        # --- CHANGED: Parsed with libyaml and cached (see load_settings_cached)
+        return load_settings_cached(config_file)
     except FileNotFoundError:
         print(f"FATAL: Configuration file not found at {config_file}")
         sys.exit(1)
@@ -70,6 +69,7 @@ def create_cameras(config: Settings, drone_cfg: DroneConfig) -> DualCameraSystem
 
     thermal_cfg = config.cameras.thermal
     if thermal_cfg.type == 'simulated':
+        from core.cameras.thermal.simulated import SimulatedThermalCamera
         thermal_cam = SimulatedThermalCamera(
             resolution=thermal_cfg.resolution,
             water_temp=thermal_cfg.water_temp,
@@ -81,6 +81,7 @@ def create_cameras(config: Settings, drone_cfg: DroneConfig) -> DualCameraSystem
     
     visual_cfg = config.cameras.visual
     if visual_cfg.type == 'simulated':
+        from core.cameras.visual.simulated import SimulatedVisualCamera
         visual_cam = SimulatedVisualCamera(resolution=visual_cfg.resolution)
     else:
         # TODO: Add RealVisualCamera(visual_cfg)
@@ -90,7 +91,8 @@ def create_cameras(config: Settings, drone_cfg: DroneConfig) -> DualCameraSystem
     dual_camera = DualCameraSystem(
         thermal_cam, 
         visual_cam, 
-        recording_cfg.enabled
+        recording_cfg.enabled,
+        thermal_range=recording_cfg.thermal_range
     )
     return dual_camera
 
@@ -115,11 +117,7 @@ async def main():
         config = load_config()
         
         # --- FIX: Find this drone's specific config ---
-        drone_cfg: DroneConfig | None = None
-        for d in config.drones:
-            if d.id == drone_id:
-                drone_cfg = d
-                break
+        drone_cfg: DroneConfig | None = config.drones_by_id.get(drone_id)
         
         if not drone_cfg:
             print(f"FATAL: No configuration found for drone with ID '{drone_id}' in mission_config.yaml")
@@ -210,5 +208,8 @@ async def main():
         print(f"[main {drone_id}] Shutdown complete.")
 
 if __name__ == "__main__":
+    # Modules on the per-frame path log through `logging`; same "[Component] ..." output as print
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    install_fast_loop() # Must run before the loop (and any Drone) is created
     asyncio.run(main())
 
@@ -7,6 +7,8 @@ from core.drone import Position
 class DirectFlightStrategy:
     """Direct flight algorithm - fly straight to target"""
     
+    __slots__ = ('name', 'description')
+    
     def __init__(self):
         self.name = "direct"
         self.description = "Fly directly to target position"
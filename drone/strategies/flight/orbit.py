@@ -9,30 +9,34 @@ from core.drone import Drone
 class OrbitFlightStrategy:
     """Algorithm to fly in a circle around a target position."""
     
+    __slots__ = ('name', 'description', 'config', '_offsets', '_i')
+    
     def __init__(self, config: OrbitConfig):
         self.name = "orbit"
         self.description = "Fly in a circle around a target"
         self.config = config
-        self.current_angle_deg = 0
+        # --- CHANGED: The 8 orbit offsets are fixed, so compute them once ---
+        # Order matches the old angle stepping: 45, 90, ..., 315, 0 degrees
+        self._offsets = tuple(
+            (config.radius * math.cos(math.radians(a)), config.radius * math.sin(math.radians(a)))
+            for a in (*range(45, 360, 45), 0)
+        )
+        self._i = 0
     
     def get_next_position(self, drone: Drone, target_position: Position) -> Position:
         """
         Get the next waypoint in the orbit.
         Uses 8 discrete points for the circle.
         """
-        
-        # Increment angle, wrapping around at 360
-        self.current_angle_deg = (self.current_angle_deg + 45) % 360
-        angle_rad = math.radians(self.current_angle_deg)
-        
-        # Calculate new X, Y relative to the target
-        x = target_position.x + (self.config.radius * math.cos(angle_rad))
-        y = target_position.y + (self.config.radius * math.sin(angle_rad))
+        dx, dy = self._offsets[self._i]
+        self._i = (self._i + 1) % len(self._offsets)
         
         # Z is relative to the target's Z (e.g., sea level)
-        z = target_position.z + self.config.altitude_offset
-        
-        return Position(x=x, y=y, z=z)
+        return Position(
+            x=target_position.x + dx,
+            y=target_position.y + dy,
+            z=target_position.z + self.config.altitude_offset
+        )
 
 # Factory function for composition
 def create_orbit_flight_strategy(config: OrbitConfig):
@@ -7,6 +7,8 @@ from core.position import Position
 class PrecisionHoverFlightStrategy:
     """Precision hover - positions drone at exact offset above target"""
     
+    __slots__ = ('name', 'description', 'hover_altitude_offset')
+    
     def __init__(self, hover_altitude_offset: float = 2.0):
         self.name = "precision_hover"
         self.description = "Hover at precise altitude above target"
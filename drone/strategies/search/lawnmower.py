@@ -1,6 +1,7 @@
 """
 Lawnmower search algorithm - for systematic patrol
 """
+import numpy as np
 from core.position import Position
 from core.config_models import LawnmowerConfig
 from core.drone import Drone
@@ -8,48 +9,56 @@ from core.drone import Drone
 class LawnmowerSearchStrategy:
     """Systematic 'lawnmower' grid search."""
     
+    __slots__ = ('name', 'description', 'config', '_waypoints', '_plan_key', '_i')
+    
     def __init__(self, config: LawnmowerConfig):
         self.name = "lawnmower"
         self.description = "Systematic grid search pattern"
         self.config = config
-        self.current_leg = 0
+        # --- CHANGED: The whole pattern is deterministic, so it's built once ---
+        # (per search area/size) and then just walked with an index. Kept as
+        # plain (x, y, z) tuples; each call hands out a fresh Position, so a
+        # caller adjusting one can't alter the cached plan.
+        self._waypoints: list[tuple[float, float, float]] | None = None
+        self._plan_key = None
+        self._i = 0
+    
+    def _plan(self, search_area: Position, search_size: float) -> list[tuple[float, float, float]]:
+        """Builds every leg waypoint for this area/size."""
+        # Assumes search_area is the center (0,0) and size is total width
+        half_width = search_size / 2.0
+        legs = np.arange(self.config.num_legs + 1)
+        
+        # Y position per leg: start at one edge and move across,
+        # stopping at the boundary
+        y_pos = -half_width + legs * self.config.spacing
+        in_area = y_pos <= half_width
+        legs, y_pos = legs[in_area], y_pos[in_area]
+        
+        # Alternate direction for each leg: even legs fly +X, odd legs -X
+        x_pos = np.where(legs % 2 == 0, half_width, -half_width)
+        
+        z = self.config.patrol_altitude
+        return [
+            (x + search_area.x, y + search_area.y, float(z))
+            for x, y in zip(x_pos.tolist(), y_pos.tolist())
+        ]
         
     def get_next_position(self, drone: Drone, search_area: Position, search_size: float) -> Position | None:
         """
         Get the next waypoint in the lawnmower pattern.
         Returns None if the pattern is complete.
         """
-        if self.current_leg > self.config.num_legs:
-            return None # Signal pattern is complete
-
-        # Calculate leg start and end
-        # Assumes search_area is the center (0,0) and size is total width
-        half_width = search_size / 2.0
-        x_start = -half_width
+        key = (search_area.x, search_area.y, search_size)
+        if key != self._plan_key:
+            self._waypoints = self._plan(search_area, search_size)
+            self._plan_key = key
         
-        # Calculate Y position for this leg
-        # Start at one edge and move across
-        y_pos = -half_width + (self.current_leg * self.config.spacing)
-        
-        # Check if we've gone past the boundary
-        if y_pos > half_width:
-             return None # Pattern complete
-             
-        # Alternate direction for each leg
-        if self.current_leg % 2 == 0:
-            # Even leg, fly +X
-            x_pos = half_width
-        else:
-            # Odd leg, fly -X
-            x_pos = -half_width
-            
-        self.current_leg += 1
-        
-        return Position(
-            x=x_pos + search_area.x,
-            y=y_pos + search_area.y,
-            z=self.config.patrol_altitude
-        )
+        if self._i >= len(self._waypoints):
+            return None # Signal pattern is complete
+        x, y, z = self._waypoints[self._i]
+        self._i += 1
+        return Position.model_construct(x=x, y=y, z=z)
 
 # Factory function for composition
 def create_lawnmower_search_strategy(config: LawnmowerConfig):
@@ -8,6 +8,8 @@ import random
 class RandomSearchStrategy:
     """Random search algorithm - random pattern for search"""
     
+    __slots__ = ('name', 'description')
+    
     def __init__(self):
         self.name = "random"
         self.description = "Random search pattern"
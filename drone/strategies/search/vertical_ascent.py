@@ -7,6 +7,8 @@ from core.position import Position
 class VerticalAscentSearchStrategy:
     """Vertical ascent search - climb vertically while scanning"""
     
+    __slots__ = ('name', 'description', 'max_altitude', 'step_size', 'current_altitude')
+    
     def __init__(self, max_altitude: float = 120.0, step_size: float = 5.0):
         self.name = "vertical_ascent"
         self.description = "Climb vertically while scanning"
@@ -6,6 +6,7 @@ This module verifies that:
 - The main configuration file (mission_config.yaml) is valid.
 - All strategy factories can create their respective strategies.
 - Drone health tracking logic works.
+- The mission state machine dispatches, nests and cancels triggers correctly.
 """
 import sys
 import yaml
@@ -23,8 +24,9 @@ if str(ROOT) not in sys.path:
 
 try:
     # Core components
-    from core.position import Position
+    from core.position import Position, PositionArray
     from core.drone import Drone, SimulatedFlightController
+    from core.state_machine import MissionStateMachine, MissionPhase, InvalidTriggerError
     from core.config_models import (
         Settings, LawnmowerConfig, OrbitConfig, 
         PrecisionHoverConfig, VerticalAscentConfig
@@ -56,6 +58,21 @@ def test_position_is_standalone():
     assert "x=100.0" in str(pos1)
     print("✓ Position works independently")
 
+def test_position_array_pairwise_distances():
+    """Verify batched pairwise distances match the scalar Position.distance_to"""
+    print("Testing: PositionArray pairwise distances...")
+    a = [Position(x=0, y=0, z=0), Position(x=100, y=200, z=15)]
+    b = [Position(x=3, y=4, z=0), Position(x=150, y=250, z=15), Position(x=-10, y=5, z=2)]
+    dist = PositionArray.from_positions(a).distances_to(PositionArray.from_positions(b))
+    assert dist.shape == (2, 3)
+    for i, p in enumerate(a):
+        for j, q in enumerate(b):
+            assert abs(dist[i, j] - p.distance_to(q)) < 1e-3
+    assert PositionArray.from_positions(b)[1].x == 150.0
+    row = a[1].distances_to(PositionArray.from_positions(b).as_array())
+    assert row.shape == (3,) and all(abs(row[j] - dist[1, j]) < 1e-3 for j in range(3))
+    print("✓ PositionArray distances match Position.distance_to")
+
 def test_can_create_multiple_drones():
     """Verify drones have unique IDs and use the correct constructor"""
     print("Testing: Multiple drone creation...")
@@ -121,6 +138,25 @@ def test_strategy_factories():
     
     print("✓ All strategy factories work correctly")
 
+def test_lawnmower_pattern():
+    """Verify the precomputed lawnmower legs alternate direction and stop at the boundary"""
+    print("Testing: Lawnmower waypoint pattern...")
+    lawn = LawnmowerSearchStrategy(
+        LawnmowerConfig(patrol_altitude=50, spacing=20, leg_length=100, num_legs=5)
+    )
+    area = Position(x=10, y=5, z=0)
+    
+    waypoints = []
+    while (wp := lawn.get_next_position(None, area, 60)) is not None:
+        waypoints.append(wp)
+    
+    # 60m wide area with 20m spacing: legs at y = -30, -10, 10, 30 (relative)
+    assert [wp.y for wp in waypoints] == [-25.0, -5.0, 15.0, 35.0]
+    assert [wp.x for wp in waypoints] == [40.0, -20.0, 40.0, -20.0]
+    assert all(wp.z == 50 for wp in waypoints)
+    assert lawn.get_next_position(None, area, 60) is None
+    print("✓ Lawnmower pattern is correct")
+
 async def test_health_tracking():
     """Verify health tracking works with async telemetry"""
     print("Testing: Health tracking...")
@@ -145,6 +181,127 @@ async def test_health_tracking():
     print("✓ Health tracking works correctly")
 
 
+class _StubMqtt:
+    async def publish_raw(self, topic, payload):
+        pass
+
+class _StubLogger:
+    def log(self, message, level="info"):
+        pass
+
+class _StubMissionModel:
+    """Just enough of MissionController for MissionStateMachine"""
+    CALLBACKS = (
+        '_run_preflight', '_run_takeoff', '_run_search_step', '_run_standby', '_run_patrol',
+        '_run_overwatch', '_request_operator_confirmation', '_handle_rejection',
+        '_request_delivery', '_run_payload_delivery', '_run_return_to_home', '_run_land',
+        '_log_mission_summary', '_run_emergency_land', '_run_local_operator_takeover',
+        '_run_local_operator_release',
+    )
+
+    def __init__(self, role, mission_type, hooks=None):
+        self.role = role
+        self.current_mission_type = mission_type
+        self.drone = Drone(SimulatedFlightController(), drone_id=f"{role}_1")
+        self.logger = _StubLogger()
+        self._phase_changed_evt = asyncio.Event()
+        self.called = []
+        hooks = hooks or {}
+        for name in self.CALLBACKS:
+            setattr(self, name, self._make_callback(name, hooks.get(name)))
+        self.state_machine = MissionStateMachine(self, _StubMqtt())
+
+    def _make_callback(self, name, hook):
+        async def callback(*args, **kwargs):
+            self.called.append(name)
+            if hook is not None:
+                await hook(self)
+        return callback
+
+def test_state_machine_conditional_takeoff():
+    """Verify takeoff_success picks the destination matching role + mission type"""
+    print("Testing: Conditional takeoff_success selection...")
+    cases = [
+        ('scout', 'MOB_SEARCH', MissionPhase.ROLE_SEARCH_PRIMARY),
+        ('utility', 'MOB_SEARCH', MissionPhase.ROLE_SEARCH_ASSIST),
+        ('payload', 'STANDBY', MissionPhase.ROLE_EMERGENCY_STANDBY),
+        ('utility', 'PATROL', MissionPhase.ROLE_UTILITY_TASK),
+        ('payload', 'PAYLOAD_DELIVERY', MissionPhase.DELIVERING),
+    ]
+    async def run(role, mission_type):
+        model = _StubMissionModel(role, mission_type)
+        model.state = MissionPhase.TAKEOFF
+        assert await model.takeoff_success() is True
+        return model.state
+    for role, mission_type, expected in cases:
+        assert asyncio.run(run(role, mission_type)) == expected, (role, mission_type)
+    
+    async def no_match():
+        # Payload role in a MOB search: no takeoff_success candidate holds
+        model = _StubMissionModel('payload', 'MOB_SEARCH')
+        model.state = MissionPhase.TAKEOFF
+        assert await model.takeoff_success() is False
+        assert model.state == MissionPhase.TAKEOFF
+    asyncio.run(no_match())
+    print("✓ takeoff_success selects the role/mission destination")
+
+def test_state_machine_invalid_trigger():
+    """Verify a trigger with no transition from the current state raises"""
+    print("Testing: InvalidTriggerError...")
+    async def run():
+        model = _StubMissionModel('scout', 'MOB_SEARCH')
+        try:
+            await model.arrived_home() # Not valid from IDLE
+        except InvalidTriggerError:
+            return model.state
+        raise AssertionError("arrived_home from IDLE did not raise")
+    assert asyncio.run(run()) == MissionPhase.IDLE
+    print("✓ Invalid triggers raise InvalidTriggerError")
+
+def test_state_machine_nested_triggers():
+    """Verify a trigger fired from a callback chains instead of cancelling its parent"""
+    print("Testing: Nested triggers...")
+    async def preflight(model):
+        assert await model.preflight_success() is True
+    async def run():
+        model = _StubMissionModel('scout', 'MOB_SEARCH', hooks={'_run_preflight': preflight})
+        assert await model.start_mission() is True
+        return model
+    model = asyncio.run(run())
+    assert model.state == MissionPhase.TAKEOFF
+    assert model.called == ['_run_preflight', '_run_takeoff']
+    print("✓ Nested triggers chain within one transition")
+
+def test_state_machine_supersede_vs_external_cancel():
+    """Verify a newer transition cancels a running trigger, but outside cancels propagate"""
+    print("Testing: Superseded vs external trigger cancellation...")
+    async def block(model):
+        await asyncio.Event().wait()
+    
+    async def superseded():
+        model = _StubMissionModel('scout', 'MOB_SEARCH', hooks={'_run_preflight': block})
+        mission = asyncio.create_task(model.start_mission())
+        await asyncio.sleep(0)
+        assert model.state == MissionPhase.PREFLIGHT
+        assert await model.trigger_emergency() is True
+        assert await mission is False # Superseded: absorbed, not raised
+        assert model.state == MissionPhase.EMERGENCY
+    asyncio.run(superseded())
+    
+    async def external():
+        model = _StubMissionModel('scout', 'MOB_SEARCH', hooks={'_run_preflight': block})
+        mission = asyncio.create_task(model.start_mission())
+        await asyncio.sleep(0)
+        mission.cancel()
+        try:
+            await mission
+        except asyncio.CancelledError:
+            pass
+        assert mission.cancelled() # Propagated, so the task really ends
+    asyncio.run(external())
+    print("✓ Only superseding transitions are absorbed")
+
+
 def run_async_test(test_func):
     """Simple helper to run a single async test"""
     try:
@@ -177,9 +334,15 @@ def run_all_tests():
     # List of all test functions (sync and async)
     sync_tests = [
         test_position_is_standalone,
+        test_position_array_pairwise_distances,
         test_can_create_multiple_drones,
         test_config_loading,
-        test_strategy_factories
+        test_strategy_factories,
+        test_lawnmower_pattern,
+        test_state_machine_conditional_takeoff,
+        test_state_machine_invalid_trigger,
+        test_state_machine_nested_triggers,
+        test_state_machine_supersede_vs_external_cancel,
     ]
     async_tests = [
         test_health_tracking
@@ -5,9 +5,10 @@ This server runs as part of the Coordinator and provides a link
 to a web-based frontend.
 """
 import asyncio
-import json
+import logging
+import orjson
 import websockets
-from typing import Set, TYPE_CHECKING
+from typing import List, TYPE_CHECKING
 
 # --- Robust Import Logic ---
 import sys
@@ -27,6 +28,17 @@ from core.position import Position       # <-- FIX: Added missing import
 if TYPE_CHECKING:
     from .coordinator import Coordinator # Use relative import for type check
 
+logger = logging.getLogger(__name__)
+
+# Clients per send burst before yielding to the event loop (MQTT relay etc.)
+BROADCAST_BATCH_SIZE = 50
+
+def _to_jsonable(obj):
+    """orjson fallback for Pydantic models and plain objects."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return vars(obj)
+
 class GcsServer:
     """
     Manages WebSocket communication with GCS clients.
@@ -36,8 +48,20 @@ class GcsServer:
     def __init__(self, config: GcsConfig):
         self.config = config
         self.controller: 'Coordinator' | None = None # Controller is set *after* init
-        self.clients: Set[websockets.WebSocketServerProtocol] = set()
-        print(f"[GcsServer] Initialized. Will listen on {config.host}:{config.port}")
+        # A list: broadcast() iterates a snapshot of it, so (un)registering
+        # mid-broadcast can't break the iteration
+        self.clients: List[websockets.WebSocketServerProtocol] = []
+        # --- NEW: Operator message type -> handler (each takes the parsed message) ---
+        self._handlers = {
+            'TRIGGER_MOB_MODE': self._on_trigger_mob,
+            'CONFIRM_TARGET': self._on_confirm_target,
+            'REJECT_TARGET': self._on_reject_target,
+            'TRIGGER_PATROL_MODE': self._on_trigger_patrol,
+            'TRIGGER_OVERWATCH_MODE': self._on_trigger_overwatch,
+        }
+        # --- NEW: Per-drone (display key, encoded frame) of the last telemetry sent
+        self._last_telemetry: dict = {}
+        logger.info("[GcsServer] Initialized. Will listen on %s:%s", config.host, config.port)
 
     def set_controller(self, controller: 'Coordinator'):
         """Dependency injection for the Coordinator."""
@@ -46,58 +70,70 @@ class GcsServer:
 
     async def _register(self, websocket: websockets.WebSocketServerProtocol):
         """Register a new GCS client."""
-        self.clients.add(websocket)
-        print(f"[GcsServer] Client connected: {websocket.remote_address}. Total clients: {len(self.clients)}")
+        self.clients.append(websocket)
+        logger.info("[GcsServer] Client connected: %s. Total clients: %d", websocket.remote_address, len(self.clients))
 
     async def _unregister(self, websocket: websockets.WebSocketServerProtocol):
         """Unregister a GCS client."""
-        self.clients.remove(websocket)
-        print(f"[GcsServer] Client disconnected: {websocket.remote_address}. Total clients: {len(self.clients)}")
+        self._drop_client(websocket)
+        logger.info("[GcsServer] Client disconnected: %s. Total clients: %d", websocket.remote_address, len(self.clients))
 
-    async def _handle_message(self, message: str):
+    def _drop_client(self, websocket: websockets.WebSocketServerProtocol):
+        """Remove a client if still present (broadcast() may have pruned it already)."""
+        try:
+            self.clients.remove(websocket)
+        except ValueError:
+            pass
+
+    async def _handle_message(self, message: str | bytes):
         """Handle incoming messages from a GCS client."""
         # --- FIX: Check if controller is set ---
         if not self.controller:
-            print("[GcsServer] Error: Controller not set. Ignoring message.")
+            logger.error("[GcsServer] Error: Controller not set. Ignoring message.")
             return
         # -------------------------------------
 
         try:
-            data = json.loads(message)
+            data = orjson.loads(message) # Accepts str or bytes frames
             msg_type = data.get('type')
             
-            if msg_type == 'TRIGGER_MOB_MODE':
-                print("[GcsServer] Received TRIGGER_MOB_MODE from operator.")
-                await self.controller.trigger_mob_event()
-
-            elif msg_type == 'CONFIRM_TARGET':
-                drone_id = data.get('data', {}).get('drone_id')
-                print(f"[GcsServer] Received CONFIRM_TARGET from operator for {drone_id}.")
-                await self.controller.handle_operator_confirmation(drone_id)
-                
-            elif msg_type == 'REJECT_TARGET':
-                drone_id = data.get('data', {}).get('drone_id')
-                print(f"[GcsServer] Received REJECT_TARGET from operator for {drone_id}.")
-                await self.controller.handle_operator_rejection(drone_id)
-            
-            elif msg_type == 'TRIGGER_PATROL_MODE':
-                print("[GcsServer] Received TRIGGER_PATROL_MODE from operator.")
-                await self.controller.trigger_patrol_mode()
-            
-            elif msg_type == 'TRIGGER_OVERWATCH_MODE':
-                print("[GcsServer] Received TRIGGER_OVERWATCH_MODE from operator.")
-                # TODO: Get position from GCS click
-                default_pos = {"x": 100.0, "y": 100.0, "z": 0.0} 
-                pos_data = data.get('data', {"position": default_pos})
-                await self.controller.trigger_overwatch_mode(pos_data)
-
-            else:
-                print(f"[GcsServer] Unknown message type: {msg_type}")
-                
-        except json.JSONDecodeError:
-            print(f"[GcsServer] Received invalid JSON: {message}")
+            handler = self._handlers.get(msg_type)
+            if handler is None:
+                logger.warning("[GcsServer] Unknown message type: %s", msg_type)
+                return
+            await handler(data)
+
+        except orjson.JSONDecodeError:
+            logger.warning("[GcsServer] Received invalid JSON: %r", message)
         except Exception as e:
-            print(f"[GcsServer] Error handling message: {e}")
+            logger.error("[GcsServer] Error handling message: %s", e)
+
+    # --- Operator message handlers ---
+
+    async def _on_trigger_mob(self, data: dict):
+        logger.info("[GcsServer] Received TRIGGER_MOB_MODE from operator.")
+        await self.controller.trigger_mob_event()
+
+    async def _on_confirm_target(self, data: dict):
+        drone_id = data.get('data', {}).get('drone_id')
+        logger.info("[GcsServer] Received CONFIRM_TARGET from operator for %s.", drone_id)
+        await self.controller.handle_operator_confirmation(drone_id)
+
+    async def _on_reject_target(self, data: dict):
+        drone_id = data.get('data', {}).get('drone_id')
+        logger.info("[GcsServer] Received REJECT_TARGET from operator for %s.", drone_id)
+        await self.controller.handle_operator_rejection(drone_id)
+
+    async def _on_trigger_patrol(self, data: dict):
+        logger.info("[GcsServer] Received TRIGGER_PATROL_MODE from operator.")
+        await self.controller.trigger_patrol_mode()
+
+    async def _on_trigger_overwatch(self, data: dict):
+        logger.info("[GcsServer] Received TRIGGER_OVERWATCH_MODE from operator.")
+        # TODO: Get position from GCS click
+        default_pos = {"x": 100.0, "y": 100.0, "z": 0.0} 
+        pos_data = data.get('data', {"position": default_pos})
+        await self.controller.trigger_overwatch_mode(pos_data)
 
     async def _connection_handler(self, websocket: websockets.WebSocketServerProtocol, path: str):
         """Handle a single client connection's lifecycle."""
@@ -105,15 +141,15 @@ class GcsServer:
         try:
             # Listen for incoming messages
             async for message in websocket:
-                await self._handle_message(str(message)) # FIX: Was self.handle_message
+                await self._handle_message(message) # FIX: Was self.handle_message
         except websockets.exceptions.ConnectionClosed:
-            print(f"[GcsServer] Connection closed by client.")
+            logger.info("[GcsServer] Connection closed by client.")
         finally:
             await self._unregister(websocket)
 
     async def run(self):
         """Start the WebSocket server."""
-        print(f"[GcsServer] Starting server on ws://{self.config.host}:{self.config.port}...")
+        logger.info("[GcsServer] Starting server on ws://%s:%s...", self.config.host, self.config.port)
         try:
             server = await websockets.serve(
                 self._connection_handler,
@@ -122,7 +158,7 @@ class GcsServer:
             )
             await server.wait_closed()
         except OSError as e:
-            print(f"[GcsServer] FATAL: Could not start server (port {self.config.port} likely in use). {e}")
+            logger.critical("[GcsServer] FATAL: Could not start server (port %s likely in use). %s", self.config.port, e)
             raise
             
     async def broadcast(self, payload: dict):
@@ -130,33 +166,82 @@ class GcsServer:
         if not self.clients:
             return # No one to send to
         
-        # Use default=vars to handle Pydantic models
-        message = json.dumps(payload, default=vars)
+        # Encoded once for all clients. Decoded to str because the frontend
+        # JSON.parse()s event.data, which needs text (not binary) frames.
+        await self.broadcast_raw(orjson.dumps(payload, default=_to_jsonable).decode())
+    
+    async def broadcast_raw(self, message: str):
+        """Send an already-encoded JSON text frame to all connected clients."""
+        if not self.clients:
+            return
+        
+        clients = tuple(self.clients) # Snapshot
+        if len(clients) <= BROADCAST_BATCH_SIZE:
+            await self._send_batch(clients, message)
+            return
         
-        # Use asyncio.gather to send to all clients concurrently
-        tasks = [client.send(message) for client in self.clients]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        # Large audiences: send in batches, yielding between them so other
+        # services aren't starved during the burst
+        for i in range(0, len(clients), BROADCAST_BATCH_SIZE):
+            await self._send_batch(clients[i:i + BROADCAST_BATCH_SIZE], message)
+            await asyncio.sleep(0)
+    
+    async def _send_batch(self, clients: tuple, message: str):
+        """Send to `clients` concurrently, dropping any whose connection has closed."""
+        # The task -> client map tells us which client a failed send belongs to
+        sends = {asyncio.create_task(client.send(message)): client for client in clients}
+        done, _ = await asyncio.wait(sends)
+        for task in done:
+            exc = task.exception()
+            if exc is None:
+                continue
+            client = sends[task]
+            if isinstance(exc, websockets.exceptions.ConnectionClosed):
+                self._drop_client(client)
+            else:
+                logger.warning("[GcsServer] Error sending to %s: %s", client.remote_address, exc)
         
     async def broadcast_telemetry(self, drone_id: str, telemetry: Telemetry, state: str):
         """Helper function to format and broadcast telemetry."""
         
+        if not self.clients:
+            return
+        
         # --- FIX: `telemetry` object does not have `.id` ---
+        # Plain floats; the frontend does the rounding for display
+        pos = telemetry.position
+        
+        # --- NEW: The frontend shows everything to 0.1, so if nothing changes at
+        # that resolution (hovering, or parked in IDLE/PREFLIGHT) resend the last frame
+        key = (
+            round(pos.x, 1), round(pos.y, 1), round(pos.z, 1),
+            round(telemetry.attitude_roll, 1), round(telemetry.attitude_pitch, 1),
+            round(telemetry.attitude_yaw, 1), round(telemetry.battery, 1),
+            telemetry.state, state,
+        )
+        cached = self._last_telemetry.get(drone_id)
+        if cached is not None and cached[0] == key:
+            await self.broadcast_raw(cached[1])
+            return
+        
         payload = {
             "type": "telemetry",
             "data": {
                 "drone_id": drone_id, # Use the passed-in drone_id
-                "position": telemetry.position.model_dump(), # Use model_dump()
+                "position": {"x": pos.x, "y": pos.y, "z": pos.z},
                 "attitude": {
-                    "roll": round(telemetry.attitude_roll, 1),
-                    "pitch": round(telemetry.attitude_pitch, 1),
-                    "yaw": round(telemetry.attitude_yaw, 1),
+                    "roll": telemetry.attitude_roll,
+                    "pitch": telemetry.attitude_pitch,
+                    "yaw": telemetry.attitude_yaw,
                 },
-                "battery": round(telemetry.battery, 1),
+                "battery": telemetry.battery,
                 "state": telemetry.state,
                 "mission_phase": state,
             }
         }
-        await self.broadcast(payload)
+        message = orjson.dumps(payload).decode()
+        self._last_telemetry[drone_id] = (key, message)
+        await self.broadcast_raw(message)
         # -------------------------------------------------
 
     async def broadcast_event(self, event_type: str, data: dict):
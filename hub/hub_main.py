@@ -9,9 +9,10 @@ It runs:
 2. The SatelliteRelay (for Tier 3 Uplink) 
 """
 import asyncio
-import yaml
+import logging
+import logging.handlers
+import queue
 import sys
-import traceback
 from pathlib import Path
 
 # --- Robust Import Logic ---
@@ -22,24 +23,41 @@ if str(CORE_PATH) not in sys.path:
     sys.path.append(str(CORE_PATH))
 # --- End Import Logic ---
 
-from drone.core.config_models import Settings
+from drone.core.config_models import Settings, load_settings_cached
 from drone.core.comms import MqttClient
+from drone.core.event_loop import install_fast_loop
 from coordinator.hub.gcs_server import GcsServer
 from satellite_relay import SatelliteRelay
 
+logger = logging.getLogger("hub_main")
+
+def setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Route all hub logging through a queue: callers only enqueue the record,
+    and a listener thread does the stdout writes off the event loop.
+    The caller owns the returned listener (stop() flushes it).
+    """
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s")) # Messages carry their own [Component] tag
+    listener = logging.handlers.QueueListener(log_queue, console)
+    
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+    return listener
+
 def load_config(config_path: str = "v_0_2/scout_drone/config/mission_config.yaml") -> Settings:
-    """Load and validate configuration."""
+    """Load and validate configuration (cached, see load_settings_cached)."""
     config_file = ROOT / config_path
     try:
-        with open(config_file, 'r') as f:
-            config_data = yaml.safe_load(f)
-        settings = Settings(**config_data)
-        return settings
+        return load_settings_cached(config_file)
     except FileNotFoundError:
-        print(f"FATAL: Configuration file not found at {config_file}")
+        logger.critical("FATAL: Configuration file not found at %s", config_file)
         sys.exit(1)
     except Exception as e:
-        print(f"FATAL: Error validating configuration file {config_file}:\n{e}")
+        logger.critical("FATAL: Error validating configuration file %s:\n%s", config_file, e)
         sys.exit(1)
 
 async def main():
@@ -51,7 +69,8 @@ async def main():
 
         # 2. Create MQTT Comms Client for the Hub
         # This client represents the Hub's high-gain antenna [cite: 34]
-        mqtt_client = MqttClient(config.mqtt, client_id="tier_2_hub")
+        # Raw payloads: the relay forwards messages without decoding them
+        mqtt_client = MqttClient(config.mqtt, client_id="tier_2_hub", raw_payloads=True)
         await mqtt_client.connect()
         if not mqtt_client.is_connected:
             raise ConnectionError("Failed to connect to MQTT broker.")
@@ -64,24 +83,28 @@ async def main():
         relay = SatelliteRelay(mqtt_client)
 
         # 5. Run all services concurrently
-        print("[HubMain] Running all Tier 2 services (GCS, SatRelay)...")
+        logger.info("[HubMain] Running all Tier 2 services (GCS, SatRelay)...")
         await asyncio.gather(
             gcs_server.run(),
             relay.run()
         )
 
     except (KeyboardInterrupt, asyncio.CancelledError):
-        print("\n[HubMain] Shutting down...")
+        logger.info("\n[HubMain] Shutting down...")
     except Exception as e:
-        print(f"[HubMain] Fatal error: {e}")
-        traceback.print_exc()
+        logger.exception("[HubMain] Fatal error: %s", e)
     finally:
         if mqtt_client and mqtt_client.is_connected:
             await mqtt_client.disconnect()
-        print("[HubMain] Shutdown complete.")
+        logger.info("[HubMain] Shutdown complete.")
 
 if __name__ == "__main__":
+    # uvloop (if installed) speeds up the websocket server and MQTT relay I/O
+    install_fast_loop()
+    log_listener = setup_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("\n[HubMain] Shutdown complete.")
\ No newline at end of file
+        logger.info("\n[HubMain] Shutdown complete.")
+    finally:
+        log_listener.stop() # Drains anything still queued
\ No newline at end of file
@@ -9,49 +9,50 @@ It also serves as the P2P network backbone (signal booster) by
 simply being connected to the MQTT broker with high power.
 """
 import asyncio
-import traceback
+import logging
 from drone.core.comms import MqttClient
 
+logger = logging.getLogger(__name__)
+
 class SatelliteRelay:
     def __init__(self, mqtt: MqttClient):
         self.mqtt = mqtt
         # Topics to uplink to Tier 3 Global HQ 
         self.uplink_topics = [
             "mission/start", # All mission triggers
-            "fleet/event/+", # All major events (target found, needs relief, etc)
+            "fleet/event/#", # All major events, incl. nested ones (confirmation/{id})
             "fleet/state/+", # All state changes
         ]
+        # Wildcards stripped once; str.startswith() takes the whole tuple
+        self._uplink_prefixes = tuple(t.replace("/+", "").replace("/#", "") for t in self.uplink_topics)
         self.satcom_topic_prefix = "global_hq/uplink"
-        print("[SatRelay] Initialized. Awaiting messages for uplink.")
+        logger.info("[SatRelay] Initialized. Awaiting messages for uplink.")
 
     async def run(self):
         """Main run loop for the relay."""
-        print(f"[SatRelay] Subscribing to high-priority topics for uplink: {self.uplink_topics}")
+        logger.info("[SatRelay] Subscribing to high-priority topics for uplink: %s", self.uplink_topics)
         
         for topic in self.uplink_topics:
             await self.mqtt.subscribe(topic)
 
+        uplink_prefixes = self._uplink_prefixes
+        
         # Listen for messages from drones and GCS
-        async for topic, payload in self.mqtt.listen():
+        # Raw bytes in, same bytes out: the relay never parses or re-encodes
+        async for topic, payload in self.mqtt.listen_raw():
             try:
                 # Check if this topic is one we should uplink
                 # (Simple check, can be made more robust)
-                is_uplinkable = any(
-                    topic.startswith(t.replace("/+", "")) 
-                    for t in self.uplink_topics
-                )
-                
-                if is_uplinkable:
+                if topic.startswith(uplink_prefixes):
                     # Simulate "uplinking" by re-publishing to a new topic
                     # [cite: 35, 36]
                     uplink_topic = f"{self.satcom_topic_prefix}/{topic}"
-                    print(f"[SatRelay] Uplinking message from '{topic}' to '{uplink_topic}'")
+                    logger.info("[SatRelay] Uplinking message from '%s' to '%s'", topic, uplink_topic)
                     
-                    await self.mqtt.publish(
+                    await self.mqtt.publish_raw(
                         uplink_topic,
                         payload,
                         retain=False
                     )
             except Exception as e:
-                print(f"[SatRelay] Error handling MQTT message on {topic}: {e}")
-                traceback.print_exc()
\ No newline at end of file
+                logger.exception("[SatRelay] Error handling MQTT message on %s: %s", topic, e)
\ No newline at end of file